@@ -1,5 +1,4 @@
 import logging
-from time import sleep
 from typing import Optional, Dict
 
 from selenium import webdriver
@@ -9,6 +8,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+# Run with PYTHONPATH=src/ljpa so the shared utilities can be imported.
+from utilities.page_wait import AdaptiveWaiter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -16,10 +18,12 @@ logger = logging.getLogger(__name__)
 class EnergyJoblineScraper:
     SEARCH_URL = "https://www.energyjobline.com/jobs?keywords=PLC&date_posted=Today"
     SCREENSHOT_PATH = "/tmp/energyjobline_error.png"
+    JOB_CARD_SELECTOR = "div[data-test-id='job-card']"
 
     def __init__(self, headless: bool = True):
         self.driver = self._configure_driver(headless)
         self.wait = WebDriverWait(self.driver, 15)
+        self.waiter = AdaptiveWaiter(self.driver)
 
     def _configure_driver(self, headless: bool) -> webdriver.Firefox:
         options = FirefoxOptions()
@@ -37,9 +41,12 @@ class EnergyJoblineScraper:
                 button = self.driver.find_element(
                     By.CSS_SELECTOR, "button[data-test-id='show-more-jobs']"
                 )
+                count, height = self.waiter.item_count(self.JOB_CARD_SELECTOR)
                 button.click()
-                sleep(2)
-                self.wait.until(EC.staleness_of(button))
+                if not self.waiter.for_growth(
+                    self.JOB_CARD_SELECTOR, count, height, baseline=2, timeout=10
+                ):
+                    break
             except NoSuchElementException:
                 break
 
@@ -48,11 +55,11 @@ class EnergyJoblineScraper:
             self.driver.get(self.SEARCH_URL)
             
             # Wait for initial results and load all jobs
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-test-id='job-card']")))
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.JOB_CARD_SELECTOR)))
             self._load_all_jobs()
 
             # Get all job posts
-            posts = self.driver.find_elements(By.CSS_SELECTOR, "div[data-test-id='job-card']")
+            posts = self.driver.find_elements(By.CSS_SELECTOR, self.JOB_CARD_SELECTOR)
             response = {}
 
             for post in posts:
@@ -60,13 +67,15 @@ class EnergyJoblineScraper:
                     # Expand job description if available
                     expand_btn = post.find_element(By.CSS_SELECTOR, "button[data-test-id='read-more-button']")
                     expand_btn.click()
-                    sleep(0.5)
+                    # The card may re-render in place, so wait for the DOM to settle.
+                    self.waiter.for_quiescence(baseline=0.5, quiet=0.1, timeout=0.5)
                 except NoSuchElementException:
                     pass
 
                 # Capture text and screenshot
                 response[post.text] = post.screenshot_as_png
 
+            self.waiter.report("Energy Jobline search")
             return response
 
         except Exception as e:
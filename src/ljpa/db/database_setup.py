@@ -1,9 +1,23 @@
 import datetime
+import logging
 from os import path, getcwd
 
-from peewee import CharField, DateField, Model, SqliteDatabase, TextField, BooleanField
+from peewee import (
+    BooleanField,
+    CharField,
+    DateField,
+    DateTimeField,
+    FloatField,
+    Model,
+    SqliteDatabase,
+    TextField,
+)
+from playhouse.migrate import SqliteMigrator, migrate
 
 from utilities.config import RESOURCES_PATH
+from utilities.fingerprint import content_fingerprint
+
+logger = logging.getLogger(__name__)
 
 # Define the path for the SQLite database file.
 DATABASE_FILE_PATH = path.join(getcwd(), RESOURCES_PATH, "ai_database.db")
@@ -16,9 +30,11 @@ class TextEntry(Model):
     """
 
     content = TextField()
+    content_hash = CharField(max_length=64, null=True, unique=True)
     created_date = DateField(default=datetime.date.today)
     screenshot_path = CharField()
     cv_match = CharField(max_length=40, null=True)
+    local_cv_match = FloatField(null=True)
     vacancy_title = CharField(max_length=40, null=True)
     credentials = CharField(max_length=40, null=True)
     visa_sponsorship = CharField(max_length=40, null=True)
@@ -32,17 +48,111 @@ class TextEntry(Model):
         database = database
 
 
+class TelegramFile(Model):
+    """
+    Telegram file_id of an uploaded screenshot, keyed by the image's content hash.
+    """
+
+    content_hash = CharField(max_length=64, unique=True)
+    file_id = CharField()
+    created_date = DateField(default=datetime.date.today)
+
+    class Meta:
+        database = database
+
+
+class ScrapeWatermark(Model):
+    """
+    URNs of posts already processed from a search URL, newest first, stored as a JSON
+    list. Incremental scrapes stop scrolling once they reach one of them.
+    """
+
+    search_url = CharField(unique=True)
+    seen_urns = TextField(default="[]")
+    updated_date = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        database = database
+
+
+def _plain_column(field):
+    """
+    Returns a nullable copy of a field without index or unique constraint.
+    Indexes are created separately, once the column has been backfilled.
+    """
+    kwargs = {"null": True}
+    if isinstance(field, CharField):
+        kwargs["max_length"] = field.max_length
+    return type(field)(**kwargs)
+
+
+def migrate_database():
+    """
+    Brings an existing TextEntry table up to date with the model.
+
+    Adds any nullable model columns missing from the table. The content_hash column is
+    then backfilled for rows that have no hash yet before its unique index is created.
+    Rows whose fingerprint collides with an earlier row are duplicates and keep a NULL
+    hash, so the unique index can still be built.
+    """
+    table = TextEntry._meta.table_name
+    if not database.table_exists(table):
+        return
+
+    columns = {column.name for column in database.get_columns(table)}
+    migrator = SqliteMigrator(database)
+    for field in TextEntry._meta.sorted_fields:
+        if field.column_name in columns or not field.null:
+            continue
+        logger.info("Adding %s column to %s", field.column_name, table)
+        migrate(migrator.add_column(table, field.column_name, _plain_column(field)))
+
+    seen = {
+        content_hash
+        for (content_hash,) in TextEntry.select(TextEntry.content_hash)
+        .where(TextEntry.content_hash.is_null(False))
+        .tuples()
+    }
+    duplicates = 0
+    with database.atomic():
+        query = (
+            TextEntry.select(TextEntry.id, TextEntry.content)
+            .where(TextEntry.content_hash.is_null())
+            .order_by(TextEntry.id)
+        )
+        for entry_id, content in list(query.tuples()):
+            fingerprint = content_fingerprint(content)
+            if fingerprint in seen:
+                duplicates += 1
+                continue
+            seen.add(fingerprint)
+            TextEntry.update(content_hash=fingerprint).where(
+                TextEntry.id == entry_id
+            ).execute()
+    if duplicates:
+        logger.warning("Found %d duplicate entries without a content hash", duplicates)
+
+    indexes = {index.name for index in database.get_indexes(table)}
+    index_name = f"{table}_content_hash"
+    if index_name not in indexes:
+        logger.info("Creating unique index %s", index_name)
+        migrate(migrator.add_index(table, ("content_hash",), True))
+
+
 def setup_database():
     """
     Initializes the SQLite database and creates required tables.
+    Existing tables are migrated first, so new indexes can be created on them.
     If the TextEntry table is empty, a default entry is added.
     """
     database.connect()
-    database.create_tables([TextEntry], safe=True)
+    migrate_database()
+    database.create_tables([TextEntry, TelegramFile, ScrapeWatermark], safe=True)
 
     if not TextEntry.select().exists():
         TextEntry.create(
             content="Initial AI discussion",
+            content_hash=content_fingerprint("Initial AI discussion"),
             created_date=datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S"),
             screenshot_path="/screenshots/ai_intro.png",
             cv_match="test",
@@ -58,5 +168,6 @@ def setup_database():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     setup_database()
     print("AI database created with initial long-form entry!")
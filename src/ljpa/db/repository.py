@@ -1,32 +1,63 @@
+import json
 import logging
 from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
 
-from peewee import DoesNotExist
+from peewee import IntegrityError
 
-from db.database_setup import TextEntry
+from db.database_setup import ScrapeWatermark, TelegramFile, TextEntry
+from utilities.fingerprint import content_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# spare3 value of rows recording posts that GPT classified as not being a vacancy.
+NON_VACANCY_LABEL = "non_vacancy"
+# Number of most recent post URNs kept as the watermark of a search URL.
+WATERMARK_SIZE = 1000
+
 
 class TextEntryRepository:
     def create_entry(self, data: dict, screenshot_path: str, content: str) -> bool:
         if data.get("vacancy") != "true":
             logger.info("Skipping non-vacancy post")
+            if data.get("status") != "failed":
+                self._record_non_vacancy(content)
+            return False
+
+        content_hash = content_fingerprint(content)
+        if self.exists(content_hash):
+            logger.debug("Duplicate post found")
             return False
 
         try:
-            TextEntry.get(TextEntry.content == content)
+            self._create_new_entry(data, screenshot_path, content, content_hash)
+        except IntegrityError:
             logger.debug("Duplicate post found")
             return False
-        except DoesNotExist:
-            self._create_new_entry(data, screenshot_path, content)
-            return True
+        return True
+
+    def exists(self, content_hash: str) -> bool:
+        return TextEntry.select().where(TextEntry.content_hash == content_hash).exists()
+
+    def find_existing_hashes(self, content_hashes: Iterable[str]) -> Set[str]:
+        """Returns the subset of the given content hashes already stored, in one query."""
+        content_hashes = list(content_hashes)
+        if not content_hashes:
+            return set()
+        query = TextEntry.select(TextEntry.content_hash).where(
+            TextEntry.content_hash.in_(content_hashes)
+        )
+        return {content_hash for (content_hash,) in query.tuples()}
 
-    def _create_new_entry(self, data: dict, screenshot_path: str, content: str):
+    def _create_new_entry(
+        self, data: dict, screenshot_path: str, content: str, content_hash: str
+    ):
         TextEntry.create(
             content=content,
+            content_hash=content_hash,
             screenshot_path=screenshot_path,
             cv_match=data.get("cv_match"),
+            local_cv_match=data.get("local_cv_match"),
             vacancy_title=data.get("vacancy_title"),
             credentials=data.get("credentials"),
             visa_sponsorship=data.get("visa_sponsorship"),
@@ -36,6 +67,56 @@ class TextEntryRepository:
         )
         logger.info("New vacancy stored")
 
+    def _record_non_vacancy(self, content: str):
+        """
+        Stores a post GPT rejected as a hidden, already-sent row. It serves as a negative
+        label for the pre-classifier and lets later runs skip the post without a GPT call.
+        """
+        try:
+            TextEntry.create(
+                content=content,
+                content_hash=content_fingerprint(content),
+                screenshot_path="",
+                sent="True",
+                deleted=True,
+                spare3=NON_VACANCY_LABEL,
+                created_date=datetime.now().strftime("%Y-%m-%d-%H-%M-%S"),
+            )
+        except IntegrityError:
+            logger.debug("Duplicate post found")
+
+    def get_labelled_posts(self) -> List[Tuple[str, bool]]:
+        """Returns (content, is_vacancy) pairs for every post GPT has classified."""
+        query = TextEntry.select(TextEntry.content, TextEntry.spare3).where(
+            TextEntry.content_hash.is_null(False)
+        )
+        return [
+            (content, label != NON_VACANCY_LABEL) for content, label in query.tuples()
+        ]
+
+    def get_recent_contents(self, limit: int) -> List[str]:
+        """Returns the content of the most recently stored posts."""
+        query = (
+            TextEntry.select(TextEntry.content)
+            .where(TextEntry.content_hash.is_null(False))
+            .order_by(TextEntry.id.desc())
+            .limit(limit)
+        )
+        return [content for (content,) in query.tuples()]
+
+    def get_cv_match_pairs(self) -> List[Tuple[float, int]]:
+        """Returns (local_cv_match, GPT cv_match) pairs for rows scored both ways."""
+        query = TextEntry.select(TextEntry.local_cv_match, TextEntry.cv_match).where(
+            TextEntry.local_cv_match.is_null(False) & TextEntry.cv_match.is_null(False)
+        )
+        pairs = []
+        for local_score, cv_match in query.tuples():
+            try:
+                pairs.append((local_score, int(str(cv_match).replace("%", "").strip())))
+            except ValueError:
+                continue
+        return pairs
+
     def get_unsent_vacancies(self):
         return TextEntry.select().where(
             (TextEntry.sent == "False") & (TextEntry.deleted == False)
@@ -44,3 +125,44 @@ class TextEntryRepository:
     def mark_as_sent(self, vacancy):
         vacancy.sent = "True"
         vacancy.save()
+
+    def mark_many_as_sent(self, vacancies) -> int:
+        """Marks all given vacancies as sent in a single UPDATE; returns rows changed."""
+        ids = [vacancy.id for vacancy in vacancies]
+        if not ids:
+            return 0
+        return TextEntry.update(sent="True").where(TextEntry.id.in_(ids)).execute()
+
+    def get_screenshot_paths(self) -> Set[str]:
+        """Returns every screenshot path referenced by a row, deleted rows included."""
+        query = TextEntry.select(TextEntry.screenshot_path).distinct()
+        return {path for (path,) in query.tuples() if path}
+
+    def get_telegram_file_id(self, content_hash: str) -> Optional[str]:
+        """Returns the Telegram file_id of an already uploaded image, if any."""
+        entry = TelegramFile.get_or_none(TelegramFile.content_hash == content_hash)
+        return entry.file_id if entry else None
+
+    def save_telegram_file_id(self, content_hash: str, file_id: str):
+        TelegramFile.replace(content_hash=content_hash, file_id=file_id).execute()
+
+    def forget_telegram_file_id(self, content_hash: str):
+        TelegramFile.delete().where(TelegramFile.content_hash == content_hash).execute()
+
+    def get_watermark(self, search_url: str) -> Set[str]:
+        """Returns the URNs of posts already processed from a search URL."""
+        entry = ScrapeWatermark.get_or_none(ScrapeWatermark.search_url == search_url)
+        return set(json.loads(entry.seen_urns)) if entry else set()
+
+    def extend_watermark(self, search_url: str, urns: List[str]):
+        """Adds newly processed post URNs to the front of a search URL's watermark."""
+        if not urns:
+            return
+        entry = ScrapeWatermark.get_or_none(ScrapeWatermark.search_url == search_url)
+        previous = json.loads(entry.seen_urns) if entry else []
+        merged = list(dict.fromkeys(urns + previous))[:WATERMARK_SIZE]
+        ScrapeWatermark.replace(
+            search_url=search_url,
+            seen_urns=json.dumps(merged),
+            updated_date=datetime.now(),
+        ).execute()
@@ -1,19 +1,25 @@
+import argparse
 import logging
+from time import sleep
+from typing import Optional
 
 from services.email_processor import EmailProcessor
+from services.gpt_cache import response_cache
 from services.linkedin_service import LinkedInBot
+from services.scraper_session import ScraperSession
 from services.telegram_processor import TelegramProcessor
+from utilities.config import LINKEDIN_DAEMON_INTERVAL
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(session: Optional[ScraperSession] = None):
     logger.info("Starting LinkedIn automation bot...")
 
     try:
         bot = LinkedInBot()
-        bot.process_posts()
+        bot.process_posts(session)
 
         emailer = EmailProcessor()
         emailer.process_vacancies()
@@ -24,7 +30,40 @@ def main():
         logger.info("Process completed successfully.")
     except Exception as e:
         logger.exception(f"Unexpected error occurred during execution: {e}")
+    finally:
+        response_cache.log_stats()
+
+
+def run_daemon(interval: int) -> None:
+    """Runs the bot every `interval` seconds, keeping one warm browser session."""
+    session = ScraperSession()
+    try:
+        while True:
+            main(session)
+            session.report()
+            logger.info("Next run in %d seconds.", interval)
+            sleep(interval)
+    except KeyboardInterrupt:
+        logger.info("Daemon stopped.")
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="LinkedIn automation bot.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run repeatedly, reusing the browser session between runs",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=LINKEDIN_DAEMON_INTERVAL,
+        help="seconds between runs in daemon mode",
+    )
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(args.interval)
+    else:
+        main()
@@ -1,12 +1,19 @@
 """Services package containing core application functionality."""
 __all__ = [
+    'cover_letter_validator',
+    'cv_matcher',
     'email_processor',
     'gpt_api_client',
+    'gpt_cache',
     'gpt_processor',
-    'linkedin_processor',
     'linkedin_scraper',
     'linkedin_service',
+    'scraper_pool',
+    'scraper_session',
+    'screenshot_encoder',
     'smtp_client',
     'telegram_processor',
-    'telemessage'
+    'telemessage',
+    'vacancy_classifier',
+    'vacancy_schema'
 ]
@@ -0,0 +1,96 @@
+import logging
+import re
+from typing import List, NamedTuple
+
+from utilities.config import COVER_LETTER_MAX_WORDS
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+PASS = "pass"
+BORDERLINE = "borderline"
+REJECT = "reject"
+
+THINK_RE = re.compile(r"</?think>", re.IGNORECASE)
+PLACEHOLDER_RE = re.compile(r"\[[^\]\n]*\]|\{[^}\n]*\}|<[^>\n]+>")
+MARKDOWN_RE = re.compile(r"\*\*|__|```|^#{1,6}\s|^\s*[-*•]\s+|^\s*\d+[.)]\s+", re.MULTILINE)
+CLOSING_RE = re.compile(
+    r"^\s*(sincerely|best regards|kind regards|warm regards|regards|best wishes|"
+    r"yours (?:truly|sincerely|faithfully)|respectfully|cheers|thank you)\s*[,.!]?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+PREAMBLE_RE = re.compile(
+    r"^\s*(here(?:'s| is)\b|certainly\b|sure\b|of course\b|absolutely\b|below is\b|"
+    r"as an ai\b|i have (?:written|drafted|created)\b)",
+    re.IGNORECASE,
+)
+COMMENTARY_RE = re.compile(
+    r"\b(as an ai|let me know if|feel free to (?:adjust|modify|customi[sz]e)|"
+    r"i hope this (?:cover )?letter|this cover letter)\b",
+    re.IGNORECASE,
+)
+OPENING_RE = re.compile(r"^\s*dear\b", re.IGNORECASE)
+WEAK_OPENING_RE = re.compile(r"^\s*dear[^\n]*\n+\s*i would like to\b", re.IGNORECASE)
+
+
+class ValidationResult(NamedTuple):
+    verdict: str
+    reasons: List[str]
+
+
+class CoverLetterValidator:
+    """
+    Rule-based check of the criteria the GPT cover letter reviewer is asked to apply.
+
+    Hard failures (placeholders, markdown, closings, AI commentary, <think> residue, a
+    letter far over the length limit) reject the letter. Soft issues (slightly too long
+    or short, unexpected opening) make it borderline, which callers may escalate to the
+    GPT reviewer.
+    """
+
+    def __init__(self, max_words: int = COVER_LETTER_MAX_WORDS) -> None:
+        self.max_words = max_words
+        self.hard_max_words = int(max_words * 1.35)
+        self.min_words = max(1, max_words // 2)
+        self.hard_min_words = max(1, max_words // 4)
+
+    def validate(self, text: str) -> ValidationResult:
+        """
+        Checks a generated cover letter.
+
+        Args:
+            text (str): The letter body, before the signature is appended.
+
+        Returns:
+            ValidationResult: The verdict (PASS, BORDERLINE or REJECT) and the reasons.
+        """
+        text = (text or "").strip()
+        hard: List[str] = []
+        soft: List[str] = []
+
+        if THINK_RE.search(text):
+            hard.append("reasoning residue (<think>)")
+        if PLACEHOLDER_RE.search(text):
+            hard.append("placeholder text")
+        if MARKDOWN_RE.search(text):
+            hard.append("markdown or bullet points")
+        if CLOSING_RE.search(text):
+            hard.append("closing phrase")
+        if PREAMBLE_RE.search(text) or COMMENTARY_RE.search(text):
+            hard.append("AI preamble or commentary")
+
+        words = len(text.split())
+        if words > self.hard_max_words or words < self.hard_min_words:
+            hard.append(f"{words} words")
+        elif words > self.max_words or words < self.min_words:
+            soft.append(f"{words} words")
+        if not OPENING_RE.search(text):
+            soft.append("does not open with 'Dear'")
+        elif WEAK_OPENING_RE.search(text):
+            soft.append("opens with 'I would like to'")
+
+        if hard:
+            return ValidationResult(REJECT, hard + soft)
+        if soft:
+            return ValidationResult(BORDERLINE, soft)
+        return ValidationResult(PASS, [])
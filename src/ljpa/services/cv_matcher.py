@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from utilities.config import CV_FILE_PATH_TXT, CV_TEXT, RESOURCES_PATH
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+STOP_WORDS = frozenset(
+    """a an and are as at be by for from has have i in is it its of on or our that the
+    their this to was we were will with you your they he she his her them us not but
+    if all can do than who what which when where how into about more also""".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases the text and splits it into terms, keeping tokens like c++, c# or s7-1500."""
+    return [
+        token
+        for token in TOKEN_RE.findall((text or "").lower())
+        if token not in STOP_WORDS and len(token) > 1
+    ]
+
+
+class CVMatcher:
+    """
+    Local TF-IDF/cosine similarity between the CV and vacancy posts.
+
+    The vocabulary and IDF weights are fitted on the CV plus the posts stored so far and
+    cached on disk together with the CV vector. The cache is refitted when the CV file
+    changes. Scores range from 0 to 100 and are not on the same scale as GPT's cv_match.
+    """
+
+    CACHE_PATH = os.path.join(RESOURCES_PATH, "cv_match_index.npz")
+    CORPUS_LIMIT = 5000
+
+    def __init__(self, cv_text: str = CV_TEXT, cv_path: str = CV_FILE_PATH_TXT) -> None:
+        self.cv_text = cv_text
+        self.cv_path = cv_path
+        self.vocabulary = {}
+        self.idf: Optional[np.ndarray] = None
+        self.max_idf = 0.0
+        self.cv_vector: Optional[np.ndarray] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cv_text.strip())
+
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Scores every text against the CV in one vectorized pass.
+
+        Args:
+            texts (List[str]): The vacancy post texts.
+
+        Returns:
+            np.ndarray: Cosine similarities scaled to 0-100, in input order.
+        """
+        if not texts:
+            return np.zeros(0)
+        self._ensure_fitted()
+        matrix, oov_norms = self._term_matrix(texts)
+        norms = np.sqrt((matrix ** 2).sum(axis=1) + oov_norms)
+        norms[norms == 0] = 1.0
+        return 100 * (matrix @ self.cv_vector) / norms
+
+    def fit(self, corpus: Iterable[str]) -> None:
+        """
+        Builds the vocabulary and smoothed IDF weights from the CV and the given corpus.
+        """
+        documents = [set(tokenize(self.cv_text))]
+        documents.extend(set(tokenize(text)) for text in corpus)
+        document_frequency = Counter()
+        for terms in documents:
+            document_frequency.update(terms)
+
+        terms = sorted(document_frequency)
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+        frequencies = np.array([document_frequency[term] for term in terms], dtype=float)
+        self.idf = np.log((1 + len(documents)) / (1 + frequencies)) + 1
+        self.max_idf = float(np.log(1 + len(documents)) + 1)
+
+        cv_matrix, _ = self._term_matrix([self.cv_text])
+        cv_vector = cv_matrix[0]
+        norm = np.linalg.norm(cv_vector)
+        self.cv_vector = cv_vector / norm if norm else cv_vector
+
+    def _term_matrix(self, texts: List[str]):
+        """
+        Returns the TF-IDF matrix of the texts over the vocabulary, plus the squared norm
+        that out-of-vocabulary terms (weighted with the maximum IDF) add to each row.
+        """
+        rows, columns, counts = [], [], []
+        oov_norms = np.zeros(len(texts))
+        for row, text in enumerate(texts):
+            for term, count in Counter(tokenize(text)).items():
+                index = self.vocabulary.get(term)
+                if index is None:
+                    oov_norms[row] += (count * self.max_idf) ** 2
+                else:
+                    rows.append(row)
+                    columns.append(index)
+                    counts.append(count)
+        matrix = np.zeros((len(texts), len(self.vocabulary)))
+        np.add.at(matrix, (np.array(rows, dtype=int), np.array(columns, dtype=int)), counts)
+        return matrix * self.idf, oov_norms
+
+    def _ensure_fitted(self) -> None:
+        if self.cv_vector is not None:
+            return
+        signature = self._cv_signature()
+        if self._load_cache(signature):
+            return
+
+        from db.repository import TextEntryRepository
+
+        logger.info("Fitting CV match index...")
+        self.fit(TextEntryRepository().get_recent_contents(self.CORPUS_LIMIT))
+        self._save_cache(signature)
+
+    def _cv_signature(self) -> str:
+        """Identifies the CV version: its content hash plus the file's size and mtime."""
+        try:
+            stat = os.stat(self.cv_path)
+            file_part = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except (OSError, TypeError):
+            file_part = "missing"
+        content_part = hashlib.sha256(self.cv_text.encode("utf-8")).hexdigest()
+        return f"{content_part}:{file_part}"
+
+    def _load_cache(self, signature: str) -> bool:
+        try:
+            with np.load(self.CACHE_PATH, allow_pickle=False) as cache:
+                if str(cache["signature"]) != signature:
+                    logger.info("CV changed, refitting CV match index.")
+                    return False
+                terms = cache["terms"].tolist()
+                self.idf = cache["idf"]
+                self.max_idf = float(cache["max_idf"])
+                self.cv_vector = cache["cv_vector"]
+        except (OSError, KeyError, ValueError):
+            return False
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+        return True
+
+    def _save_cache(self, signature: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.CACHE_PATH), exist_ok=True)
+            np.savez(
+                self.CACHE_PATH,
+                signature=np.array(signature),
+                terms=np.array(sorted(self.vocabulary, key=self.vocabulary.get)),
+                idf=self.idf,
+                max_idf=np.array(self.max_idf),
+                cv_vector=self.cv_vector,
+            )
+        except OSError as err:
+            logger.warning("Could not cache CV match index: %s", err)
+
+
+def calibration_report() -> Optional[float]:
+    """
+    Logs how the stored local scores relate to GPT's cv_match.
+
+    Returns:
+        Optional[float]: The Pearson correlation, or None with fewer than two scored rows.
+    """
+    from db.repository import TextEntryRepository
+
+    pairs = TextEntryRepository().get_cv_match_pairs()
+    if len(pairs) < 2:
+        logger.info("Not enough rows with both scores for calibration.")
+        return None
+    local, gpt = np.array(pairs, dtype=float).T
+    correlation = float(np.corrcoef(local, gpt)[0, 1])
+    slope, intercept = np.polyfit(local, gpt, 1)
+    logger.info(
+        "CV match calibration over %d rows: correlation %.3f, gpt ~= %.2f * local + %.2f",
+        len(pairs),
+        correlation,
+        slope,
+        intercept,
+    )
+    return correlation
+
+
+if __name__ == "__main__":
+    calibration_report()
@@ -1,21 +1,33 @@
+import asyncio
 import logging
 import re
+from collections import Counter
 from datetime import datetime, timedelta
+from typing import List, Optional
 
 from db.database_setup import TextEntry  # Model for vacancy entries
+from services.cover_letter_validator import BORDERLINE, REJECT, CoverLetterValidator
 from services.gpt_api_client import (
-    GPTApiClient,  # Renamed GPT4FreeInteraction to GPTApiClient
+    AsyncGPTApiClient,
+    GPTApiError,
+    GPTResponseFormatError,
 )
 from services.smtp_client import SMTPClient  # Renamed SMTPSender to SMTPClient
 from utilities.config import (
+    COVER_LETTER_CANDIDATES,
+    COVER_LETTER_DEADLINE,
+    COVER_LETTER_GPT_REVIEW,
     COVER_LETTER_PROMPT,
     COVER_LETTER_REVIEWER_PROMPT,
     CV_FILE_PATH_PDF,
     EMAIL_SIGNATURE,
+    SMTP_DOMAIN_RATE,
     SMTP_EMAIL,
+    SMTP_KEEPALIVE,
     SMTP_PASSWORD,
     SMTP_PORT,
     SMTP_SERVER,
+    SMTP_STARTTLS,
 )
 
 # Configure logging
@@ -29,33 +41,56 @@ class EmailProcessor:
     generating cover letters via GPT, and sending applications via SMTP.
     """
 
+    MAX_COVER_LETTER_ATTEMPTS = 10
+
     def __init__(self) -> None:
-        self.gpt_api = GPTApiClient()
         self.processed_emails = self.get_recent_applied_emails()
+        # Counters for attempts per approved letter: attempts, approved, failed.
+        self.cover_letter_stats: Counter = Counter()
+        self.validator = CoverLetterValidator()
         self.smtp_config = {
             "email": SMTP_EMAIL,
             "password": SMTP_PASSWORD,
             "smtp_server": SMTP_SERVER,
             "smtp_port": SMTP_PORT,
+            "starttls": SMTP_STARTTLS,
+            "keepalive": SMTP_KEEPALIVE,
+            "domain_rate": SMTP_DOMAIN_RATE,
         }
 
     def process_vacancies(self) -> None:
         """
         Processes eligible vacancies:
          - Extracts a valid email address
-         - Generates a cover letter
-         - Sends an application email with the applicant's CV attached.
+         - Generates cover letters for all of them concurrently
+         - Sends an application email with the applicant's CV attached, reusing
+           a single SMTP session for the whole batch.
         """
+        targets = []
         for vacancy in self.get_eligible_vacancies():
             email = self.extract_valid_email(vacancy)
-            if not email:
-                continue
-            self.send_application(email, vacancy.vacancy_title, vacancy.content)
-            vacancy.spare1 = "Applied"
-            now = datetime.now()
-            vacancy.spare2 = now.strftime("%Y-%m-%d")
-            vacancy.save()
-            logger.info("Marked vacancy '%s' as applied.", vacancy.vacancy_title)
+            if email:
+                targets.append((vacancy, email))
+
+        cover_letters = self.generate_cover_letters(
+            [vacancy.content for vacancy, _ in targets]
+        )
+        if not targets:
+            return
+
+        with SMTPClient(self.smtp_config) as smtp_client:
+            for (vacancy, email), cover_letter in zip(targets, cover_letters):
+                if cover_letter is None:
+                    logger.error("Failed to generate a valid cover letter")
+                else:
+                    self.send_application(
+                        smtp_client, email, vacancy.vacancy_title, cover_letter
+                    )
+                vacancy.spare1 = "Applied"
+                now = datetime.now()
+                vacancy.spare2 = now.strftime("%Y-%m-%d")
+                vacancy.save()
+                logger.info("Marked vacancy '%s' as applied.", vacancy.vacancy_title)
 
     def get_eligible_vacancies(self):
         """
@@ -130,37 +165,153 @@ class EmailProcessor:
             logger.warning("No email found in vacancy: %s", vacancy.vacancy_title)
             return None
 
-    def send_application(self, recipient_email: str, title: str, content: str) -> None:
+    def generate_cover_letters(self, contents: List[str]) -> List[Optional[str]]:
+        """
+        Generates cover letters for a batch of vacancies concurrently.
+
+        With COVER_LETTER_CANDIDATES above 1, each vacancy races that many
+        generate/review cycles at a time and keeps the first approved letter.
+
+        Parameters:
+            contents (List[str]): The vacancy contents used to generate the cover letters.
+
+        Returns:
+            List[Optional[str]]: The approved cover letters in input order, with None
+            for vacancies where no letter passed review.
+        """
+        if not contents:
+            return []
+
+        async def run_batch():
+            async with AsyncGPTApiClient() as gpt:
+                return await asyncio.gather(
+                    *(self._generate_cover_letter(gpt, content) for content in contents)
+                )
+
+        letters = asyncio.run(run_batch())
+        self._log_cover_letter_stats()
+        return letters
+
+    async def _generate_cover_letter(
+        self, gpt: AsyncGPTApiClient, content: str
+    ) -> Optional[str]:
+        """
+        Runs up to MAX_COVER_LETTER_ATTEMPTS generate/review cycles for a single vacancy,
+        COVER_LETTER_CANDIDATES at a time, within COVER_LETTER_DEADLINE seconds.
+
+        Returns:
+            Optional[str]: The first cover letter approved by the reviewer, or None.
+        """
+        try:
+            letter = await asyncio.wait_for(
+                self._race_cover_letters(gpt, content), timeout=COVER_LETTER_DEADLINE
+            )
+        except asyncio.TimeoutError:
+            logger.error("Cover letter deadline of %.0fs exceeded", COVER_LETTER_DEADLINE)
+            letter = None
+        self.cover_letter_stats["approved" if letter else "failed"] += 1
+        return letter
+
+    async def _race_cover_letters(
+        self, gpt: AsyncGPTApiClient, content: str
+    ) -> Optional[str]:
+        """
+        Starts waves of concurrent candidates and returns the first approved one,
+        cancelling the candidates still running.
+        """
+        gpt_request = COVER_LETTER_PROMPT + f"\nJob Description: [{content}]"
+        attempts = 0
+        while attempts < self.MAX_COVER_LETTER_ATTEMPTS:
+            wave = min(max(1, COVER_LETTER_CANDIDATES), self.MAX_COVER_LETTER_ATTEMPTS - attempts)
+            attempts += wave
+            self.cover_letter_stats["attempts"] += wave
+            tasks = [
+                asyncio.ensure_future(self._cover_letter_candidate(gpt, gpt_request))
+                for _ in range(wave)
+            ]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    try:
+                        letter = await finished
+                    except GPTResponseFormatError as e:
+                        logger.warning("Cover letter attempt failed: %s", e)
+                        continue
+                    except GPTApiError as e:
+                        logger.error("Cover letter generation aborted: %s", e)
+                        return None
+                    if letter:
+                        return letter
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return None
+
+    async def _cover_letter_candidate(
+        self, gpt: AsyncGPTApiClient, gpt_request: str
+    ) -> Optional[str]:
+        """
+        Runs one generate/review cycle. The letter is checked by the local validator;
+        only borderline letters go to the GPT reviewer, if COVER_LETTER_GPT_REVIEW is set.
+
+        Returns:
+            Optional[str]: The letter if it was approved, otherwise None.
+        """
+        # Cover letters must stay fresh: a rejected letter would otherwise come back.
+        message = await gpt.get_text(gpt_request, use_cache=False)
+        message = re.sub(r"<think>.*?</think>", "", message, flags=re.S).strip()
+
+        result = self.validator.validate(message)
+        if result.verdict == REJECT:
+            self.cover_letter_stats["rejected_locally"] += 1
+            logger.info("Cover letter rejected: %s", "; ".join(result.reasons))
+            return None
+        if result.verdict == BORDERLINE and COVER_LETTER_GPT_REVIEW:
+            self.cover_letter_stats["gpt_reviews"] += 1
+            logger.info("Borderline cover letter (%s), asking GPT reviewer", "; ".join(result.reasons))
+            double_check = (await gpt.get_text(COVER_LETTER_REVIEWER_PROMPT + message)).lower()
+            # The reviewer answers with reversed words: "eurt" approves, "eslaf" rejects.
+            if "eurt" not in double_check and (
+                "true" not in double_check or "eslaf" in double_check
+            ):
+                logger.info("Cover letter rejected by GPT reviewer")
+                return None
+        return message
+
+    def _log_cover_letter_stats(self) -> None:
+        stats = self.cover_letter_stats
+        if not stats["approved"] and not stats["failed"]:
+            return
+        logger.info(
+            "Cover letters: %d approved, %d failed, %d attempts (%.1f per approved letter), "
+            "%d rejected locally, %d sent to GPT reviewer",
+            stats["approved"],
+            stats["failed"],
+            stats["attempts"],
+            stats["attempts"] / stats["approved"] if stats["approved"] else 0.0,
+            stats["rejected_locally"],
+            stats["gpt_reviews"],
+        )
+
+    def send_application(
+        self, smtp_client: SMTPClient, recipient_email: str, title: str, message: str
+    ) -> None:
         """
         Sends an application email for a vacancy.
 
         Parameters:
+            smtp_client (SMTPClient): The open SMTP session shared across the batch.
             recipient_email (str): The email address to send the application to.
             title (str): The vacancy title used as the email subject.
-            content (str): The vacancy content used to generate the cover letter.
+            message (str): The approved cover letter used as the email body.
         """
         subject = title.title()
-        # Generate cover letter using GPT API client.
-        for i in range(10):
-            gpt_request = COVER_LETTER_PROMPT + f"\nJob Description: [{content}]"
-            message = self.gpt_api.get_text(gpt_request)
-            message = re.sub(r"<think>.*?</think>", "", message)
-            double_check = self.gpt_api.get_text(COVER_LETTER_REVIEWER_PROMPT + message)
-            if "true" in double_check.lower():
-                break
-            if i == 9:
-                logger.error("Failed to generate a valid cover letter")
-                return
         message += EMAIL_SIGNATURE
         message = message.strip()
         logger.info("Preparing application for vacancy: %s", title)
         logger.debug("Subject: %s | Message: %s", subject, message)
 
-        # Sending email via SMTP client.
-        with SMTPClient(self.smtp_config) as smtp_client:
-            smtp_client.send_message(
-                recipient_email, subject, message, CV_FILE_PATH_PDF
-            )
+        smtp_client.send_message(recipient_email, subject, message, CV_FILE_PATH_PDF)
 
         logger.info("Application email sent successfully to %s", recipient_email)
 
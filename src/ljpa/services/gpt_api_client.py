@@ -1,27 +1,67 @@
+import asyncio
 import logging
+import time
+from typing import Any, Callable, Optional
 
+import httpx
 import requests
-from utilities.config import OPENROUTER_API_KEY, OPENROUTER_MODEL
+from services.gpt_cache import GPTResponseCache, response_cache
+from utilities.config import (
+    GPT_BACKOFF_BASE,
+    GPT_BACKOFF_MAX,
+    GPT_MAX_CONCURRENCY,
+    GPT_REQUEST_TIMEOUT,
+    GPT_TRANSPORT_RETRIES,
+    OPENROUTER_API_KEY,
+    OPENROUTER_MODEL,
+)
+from utilities.retry import backoff_delay, parse_retry_after
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-class GPTResponseFormatError(Exception):
-    pass
+class GPTApiError(Exception):
+    """Base class for errors raised by the GPT clients."""
 
 
-class GPTApiClient:
-    def __init__(self):
+class GPTRequestError(GPTApiError):
+    """Raised when a request fails for good: a non-retryable status or an exhausted retry budget."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GPTResponseFormatError(GPTApiError):
+    """Raised when the API or the model returns output in an unexpected format."""
+
+
+class _BaseGPTClient:
+    """Request building, retry policy and response caching shared by the sync and async clients."""
+
+    RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        cache: Optional[GPTResponseCache] = None,
+        transport_retries: int = GPT_TRANSPORT_RETRIES,
+    ):
         self.base_url = "https://openrouter.ai/api/v1"
+        self.url = f"{self.base_url}/chat/completions"
         self.model = OPENROUTER_MODEL
         self.headers = {
             "Authorization": f"Bearer {OPENROUTER_API_KEY}",
             "Content-Type": "application/json",
         }
+        self.cache = cache or response_cache
+        self.transport_retries = transport_retries
+
+    def discard_cached(self, prompt: str, response_format: Optional[dict] = None) -> None:
+        """Drops the cached response for a prompt, e.g. after it failed validation."""
+        self.cache.discard(self.cache.make_key(self._build_payload(prompt, response_format)))
 
-    def get_text(self, prompt: str, expected_output: int = 150) -> str:
-        url = f"{self.base_url}/chat/completions"
+    def _build_payload(self, prompt: str, response_format: Optional[dict] = None) -> dict:
         payload = {
             "model": self.model,
             "messages": [
@@ -29,14 +69,197 @@ class GPTApiClient:
                 {"role": "user", "content": prompt},
             ],
         }
+        if response_format:
+            payload["response_format"] = response_format
+        return payload
 
+    def _extract_content(self, data) -> str:
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except requests.exceptions.RequestException as err:
-            logger.error("Request error: %s", str(err))
-            return "Error: Request failed"
-        except (KeyError, IndexError) as err:
-            logger.error("Response format error: %s", str(err))
-            return "Error: Invalid response format"
+            content = data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as err:
+            raise GPTResponseFormatError(f"Unexpected response body: {err!r}") from err
+        if not isinstance(content, str):
+            raise GPTResponseFormatError("Response has no text content")
+        return content
+
+    def _check_status(self, status_code: int, body: str) -> None:
+        """Raises GPTRequestError for HTTP errors that retrying cannot fix."""
+        if status_code >= 400 and status_code not in self.RETRYABLE_STATUS_CODES:
+            raise GPTRequestError(f"HTTP {status_code}: {body[:200]}", status_code)
+
+    def _read_response(
+        self, status_code: int, body: str, decode: Callable[[], Any]
+    ) -> Optional[str]:
+        """
+        Returns the content of a successful response, or None for a status worth
+        retrying. Raises for responses that retrying cannot fix.
+        """
+        if 200 <= status_code < 300:
+            try:
+                return self._extract_content(decode())
+            except ValueError as err:
+                raise GPTResponseFormatError(f"Invalid JSON body: {err}") from err
+        self._check_status(status_code, body)
+        return None
+
+    def _next_delay(
+        self, attempt: int, error: str, retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Returns how long to wait before the next attempt, or None once the retry
+        budget is spent.
+        """
+        if attempt >= self.transport_retries:
+            return None
+        delay = self._retry_delay(attempt, retry_after)
+        logger.warning("Request error: %s. Retrying in %.1fs", error, delay)
+        return delay
+
+    def _exhausted(self, error: str) -> GPTRequestError:
+        return GPTRequestError(
+            f"Request failed after {self.transport_retries + 1} attempts: {error}"
+        )
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Honors Retry-After when the server sends it, otherwise backs off with jitter."""
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return min(delay, GPT_BACKOFF_MAX)
+        return backoff_delay(attempt, GPT_BACKOFF_BASE, GPT_BACKOFF_MAX)
+
+
+class GPTApiClient(_BaseGPTClient):
+    """
+    Blocking GPT client. Requests go through one keep-alive session, and transport
+    errors (connection failures, timeouts, 429 and 5xx responses) are retried with
+    backoff before a GPTRequestError is raised.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[GPTResponseCache] = None,
+        transport_retries: int = GPT_TRANSPORT_RETRIES,
+    ):
+        super().__init__(cache, transport_retries)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+    def get_text(
+        self,
+        prompt: str,
+        expected_output: int = 150,
+        use_cache: bool = True,
+        response_format: Optional[dict] = None,
+    ) -> str:
+        payload = self._build_payload(prompt, response_format)
+        cache_key = self.cache.make_key(payload)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = self._post(payload)
+        if use_cache:
+            self.cache.set(cache_key, content, self.model)
+        return content
+
+    def _post(self, payload: dict) -> str:
+        for attempt in range(self.transport_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.url, json=payload, timeout=GPT_REQUEST_TIMEOUT
+                )
+            except requests.exceptions.RequestException as err:
+                error = str(err)
+            else:
+                content = self._read_response(
+                    response.status_code, response.text, response.json
+                )
+                if content is not None:
+                    return content
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+
+            delay = self._next_delay(attempt, error, retry_after)
+            if delay is None:
+                break
+            time.sleep(delay)
+        raise self._exhausted(error)
+
+
+class AsyncGPTApiClient(_BaseGPTClient):
+    """
+    Asynchronous GPT client built on httpx.
+
+    Use it as an async context manager; at most `max_concurrency` requests are in
+    flight at any time, however many coroutines call get_text concurrently. The retry
+    policy is the same as GPTApiClient's, and backoff sleeps do not hold a slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = GPT_MAX_CONCURRENCY,
+        cache: Optional[GPTResponseCache] = None,
+        transport_retries: int = GPT_TRANSPORT_RETRIES,
+    ):
+        super().__init__(cache, transport_retries)
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncGPTApiClient":
+        # Created here so that both are bound to the running event loop.
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=GPT_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.max_concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self._client.aclose()
+        self._client = None
+
+    async def get_text(
+        self,
+        prompt: str,
+        expected_output: int = 150,
+        use_cache: bool = True,
+        response_format: Optional[dict] = None,
+    ) -> str:
+        payload = self._build_payload(prompt, response_format)
+        cache_key = self.cache.make_key(payload)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = await self._post(payload)
+        if use_cache:
+            self.cache.set(cache_key, content, self.model)
+        return content
+
+    async def _post(self, payload: dict) -> str:
+        for attempt in range(self.transport_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(self.url, json=payload)
+            except httpx.HTTPError as err:
+                error = str(err) or type(err).__name__
+            else:
+                content = self._read_response(
+                    response.status_code, response.text, response.json
+                )
+                if content is not None:
+                    return content
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+
+            delay = self._next_delay(attempt, error, retry_after)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        raise self._exhausted(error)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import time
+from os import getcwd, path
+from typing import Optional
+
+from peewee import CharField, FloatField, Model, SqliteDatabase, TextField
+
+from utilities.config import (
+    GPT_CACHE_ENABLED,
+    GPT_CACHE_MAX_ENTRIES,
+    GPT_CACHE_TTL_HOURS,
+    RESOURCES_PATH,
+)
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+CACHE_FILE_PATH = path.join(getcwd(), RESOURCES_PATH, "gpt_cache.db")
+cache_database = SqliteDatabase(CACHE_FILE_PATH)
+
+
+class CachedResponse(Model):
+    """
+    Model representing a stored GPT completion.
+    """
+
+    key = CharField(max_length=64, primary_key=True)
+    model = CharField(null=True)
+    response = TextField()
+    created_at = FloatField()
+    last_accessed = FloatField(index=True)
+
+    class Meta:
+        database = cache_database
+
+
+class GPTResponseCache:
+    """
+    On-disk cache for GPT completions with a TTL and least-recently-used eviction.
+
+    Entries are keyed by a hash of the full request payload, so the model, the prompt
+    and any generation parameters all take part in the key.
+    """
+
+    def __init__(
+        self,
+        ttl_hours: float = GPT_CACHE_TTL_HOURS,
+        max_entries: int = GPT_CACHE_MAX_ENTRIES,
+        enabled: bool = GPT_CACHE_ENABLED,
+    ) -> None:
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._ready = False
+
+    @staticmethod
+    def make_key(payload: dict) -> str:
+        """
+        Builds the cache key for a chat completion payload.
+
+        Args:
+            payload (dict): The request body sent to the completions endpoint.
+
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON payload.
+        """
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached response for the key, or None if missing or expired.
+        """
+        if not self.enabled:
+            return None
+        self._ensure_ready()
+        entry = CachedResponse.get_or_none(CachedResponse.key == key)
+        now = time.time()
+        if entry is None or now - entry.created_at > self.ttl_seconds:
+            if entry is not None:
+                entry.delete_instance()
+            self.misses += 1
+            return None
+
+        CachedResponse.update(last_accessed=now).where(
+            CachedResponse.key == key
+        ).execute()
+        self.hits += 1
+        return entry.response
+
+    def set(self, key: str, response: str, model: Optional[str] = None) -> None:
+        """
+        Stores a response and evicts the least recently used entries above the limit.
+        """
+        if not self.enabled or not response:
+            return
+        self._ensure_ready()
+        now = time.time()
+        with cache_database.atomic():
+            CachedResponse.replace(
+                key=key,
+                model=model,
+                response=response,
+                created_at=now,
+                last_accessed=now,
+            ).execute()
+            self._evict(now)
+
+    def discard(self, key: str) -> None:
+        """
+        Removes an entry, e.g. when the caller found the cached response unusable.
+        """
+        if not self.enabled:
+            return
+        self._ensure_ready()
+        CachedResponse.delete().where(CachedResponse.key == key).execute()
+
+    def log_stats(self) -> None:
+        """
+        Logs the hit/miss counters collected since start-up.
+        """
+        total = self.hits + self.misses
+        if not total:
+            return
+        logger.info(
+            "GPT cache: %d hits, %d misses (%.0f%% hit rate)",
+            self.hits,
+            self.misses,
+            100 * self.hits / total,
+        )
+
+    def _evict(self, now: float) -> None:
+        CachedResponse.delete().where(
+            CachedResponse.created_at < now - self.ttl_seconds
+        ).execute()
+        overflow = CachedResponse.select().count() - self.max_entries
+        if overflow > 0:
+            oldest = (
+                CachedResponse.select(CachedResponse.key)
+                .order_by(CachedResponse.last_accessed)
+                .limit(overflow)
+            )
+            CachedResponse.delete().where(CachedResponse.key.in_(oldest)).execute()
+
+    def _ensure_ready(self) -> None:
+        if not self._ready:
+            cache_database.create_tables([CachedResponse], safe=True)
+            self._ready = True
+
+
+response_cache = GPTResponseCache()
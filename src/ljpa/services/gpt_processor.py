@@ -1,15 +1,46 @@
+import asyncio
+import json
 import logging
 import re
-import time
-from typing import Dict
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from utilities.config import RECRUITMENT_PROMPT, TELEGRAM_CLEAR_PROMPT
-from services.gpt_api_client import GPTApiClient, GPTResponseFormatError
+from pydantic import ValidationError
+
+from utilities.config import (
+    GPT_ANALYSIS_BATCH_SIZE,
+    GPT_FORMAT_RETRIES,
+    GPT_STRUCTURED_OUTPUT,
+    OPENROUTER_MODEL,
+    RECRUITMENT_BATCH_JSON_PROMPT,
+    RECRUITMENT_BATCH_PROMPT,
+    RECRUITMENT_JSON_PROMPT,
+    RECRUITMENT_PROMPT,
+    TELEGRAM_CLEAR_PROMPT,
+)
+from utilities.retry import backoff_delay
+from services.gpt_api_client import (
+    AsyncGPTApiClient,
+    GPTApiError,
+    GPTRequestError,
+    GPTResponseFormatError,
+)
+from services.vacancy_schema import (
+    ANALYSIS_RESPONSE_FORMAT,
+    BATCH_ANALYSIS_RESPONSE_FORMAT,
+    VacancyAnalysis,
+    repair_json,
+    split_batch_results,
+)
 
 # Configure logging for the module.
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Header of a per-post block in a batched analysis response: "=== RESULT <id> ===".
+BATCH_RESULT_RE = re.compile(r"^\s*=+\s*RESULT\s+(\d+)\s*=+\s*$", re.IGNORECASE | re.MULTILINE)
+BATCH_END_RE = re.compile(r"^\s*=+\s*END\s+RESULT\s+\d+\s*=+\s*$", re.IGNORECASE | re.MULTILINE)
+
 
 class GPTProcessor:
     """
@@ -17,49 +48,232 @@ class GPTProcessor:
     - Analyzes vacancy details.
     - Generates cleaned vacancy descriptions for Telegram notifications.
     """
-    MAX_RETRIES = 13
-    RETRY_DELAY = 5
+    # Budget for malformed model output only; transport errors are retried by the client.
+    MAX_RETRIES = GPT_FORMAT_RETRIES
+    RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 10
+    # Number of posts analyzed per request by analyze_vacancies; 1 disables batching.
+    BATCH_SIZE = GPT_ANALYSIS_BATCH_SIZE
+    # Request JSON validated against VacancyAnalysis instead of key:[value] text.
+    STRUCTURED = GPT_STRUCTURED_OUTPUT
+    # Statuses with which a provider rejects the response_format parameter.
+    FORMAT_REJECTED_STATUS_CODES = {400, 422}
+    # Models that rejected response_format in this process; they get the plain prompts.
+    _plain_models: Set[str] = set()
 
     def __init__(self) -> None:
-        self.gpt: GPTApiClient = GPTApiClient()
+        self.structured = self.STRUCTURED and OPENROUTER_MODEL not in self._plain_models
+        # Counters behind the retry-rate log line: requests, format_errors, repaired, legacy,
+        # and format_rejected for requests whose response_format the model refused.
+        self.stats: Counter = Counter()
 
-    def analyze_vacancy(self, text: str) -> Dict[str, str]:
+    def analyze_vacancies(self, texts: List[str]) -> List[Dict[str, str]]:
         """
-        Analyzes vacancy description text using a recruitment prompt and returns structured data.
-        
-        If the GPT response is invalid or missing required fields, it retries up to MAX_RETRIES times.
-        
+        Analyzes a batch of vacancy texts concurrently.
+
+        Texts are grouped BATCH_SIZE at a time into one request, so the CV in the
+        prompt is sent once per group instead of once per post. Posts whose result is
+        missing or invalid are re-queued individually, with retries on malformed
+        output. The number of requests in flight is bounded by the async client.
+
         Args:
-            text (str): The vacancy description text.
-        
+            texts (List[str]): The vacancy description texts.
+
         Returns:
-            dict: Parsed vacancy data, or {"vacancy": "false"} if processing fails.
+            List[dict]: Parsed vacancy data, in the same order as the input texts.
         """
-        clean_text = self._sanitize_text(text)
+        if not texts:
+            return []
+        size = max(1, self.BATCH_SIZE)
+        groups = [texts[i:i + size] for i in range(0, len(texts), size)]
+        results = asyncio.run(self._run_batch(self._analyze_group_async, groups))
+        logger.info("Analyzed %d posts in %d batched requests", len(texts), len(groups))
+        self.log_stats()
+        return [item for group in results for item in group]
+
+    def log_stats(self) -> None:
+        """
+        Logs how often analysis responses needed a retry, a repair or the legacy parser.
+        """
+        requests = self.stats["requests"]
+        if not requests:
+            return
+        logger.info(
+            "Vacancy analysis: %d requests, %d format errors (%.1f%% retry rate), "
+            "%d repaired JSON responses, %d legacy-format responses",
+            requests,
+            self.stats["format_errors"],
+            100 * self.stats["format_errors"] / requests,
+            self.stats["repaired"],
+            self.stats["legacy"],
+        )
+
+    def generate_descriptions(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Generates refined Telegram descriptions for a batch of vacancy posts concurrently.
+
+        Args:
+            texts (List[str]): The original vacancy contents.
+
+        Returns:
+            List[Optional[str]]: Refined descriptions in input order, with None where
+            the description could not be generated.
+        """
+        if not texts:
+            return []
+        return asyncio.run(self._run_batch(self._generate_description_async, texts))
+
+    async def _run_batch(self, handler, items: list) -> list:
+        async with AsyncGPTApiClient() as gpt:
+            return await asyncio.gather(*(handler(gpt, item) for item in items))
+
+    async def _analyze_group_async(
+        self, gpt: AsyncGPTApiClient, texts: List[str]
+    ) -> List[Dict[str, str]]:
+        """
+        Analyzes several posts with a single request and re-queues failed items one by one.
+        """
+        if len(texts) == 1:
+            return [await self._analyze_vacancy_async(gpt, texts[0])]
+
+        gpt_request = self._build_batch_request(texts)
+        response_format = BATCH_ANALYSIS_RESPONSE_FORMAT if self.structured else None
+        try:
+            self.stats["requests"] += 1
+            response = await gpt.get_text(gpt_request, response_format=response_format)
+        except GPTRequestError as e:
+            if self._format_rejected(e, response_format):
+                return await self._analyze_group_async(gpt, texts)
+            logger.error("Failed to process vacancy batch. Error: %s", e)
+            return [self._failed_result() for _ in texts]
+        except GPTResponseFormatError as e:
+            logger.error("Invalid response for vacancy batch. Error: %s", e)
+            response = ""
+
+        blocks = self._split_batch_response(response)
+        results: List[Optional[Dict[str, str]]] = []
+        failed = []
+        for index, text in enumerate(texts):
+            try:
+                if index + 1 not in blocks:
+                    raise GPTResponseFormatError("Missing result block")
+                results.append(self._validate_response(blocks[index + 1]))
+            except (GPTResponseFormatError, KeyError) as e:
+                self.stats["format_errors"] += 1
+                logger.warning("Batch item %d failed: %s", index + 1, e)
+                results.append(None)
+                failed.append(index)
+
+        if not failed:
+            return results
+        if len(failed) == len(texts):
+            gpt.discard_cached(gpt_request, response_format)
+        logger.info("Re-queuing %d of %d batch items individually", len(failed), len(texts))
+        retried = await asyncio.gather(
+            *(self._analyze_vacancy_async(gpt, texts[index]) for index in failed)
+        )
+        for index, result in zip(failed, retried):
+            results[index] = result
+        return results
+
+    def _build_batch_request(self, texts: List[str]) -> str:
+        """
+        Builds a batched analysis request with one delimited, numbered block per post.
+        """
+        parts = [RECRUITMENT_BATCH_JSON_PROMPT if self.structured else RECRUITMENT_BATCH_PROMPT]
+        for number, text in enumerate(texts, start=1):
+            # Keep post text from imitating the block delimiters.
+            clean_text = self._sanitize_text(text).replace("===", "==")
+            parts.append(f"=== POST {number} ===\n{clean_text}\n=== END POST {number} ===")
+        return "\n\n".join(parts)
+
+    def _split_batch_response(self, response: str) -> Dict[int, Union[str, Dict[str, Any]]]:
+        """
+        Splits a batched response into per-post results keyed by post number: decoded
+        JSON objects in structured mode, otherwise key:[value] text blocks.
+        """
+        if self.structured:
+            data = self._decode_json(response)
+            if data is not None:
+                return split_batch_results(data)
+        blocks = {}
+        headers = list(BATCH_RESULT_RE.finditer(response))
+        for position, header in enumerate(headers):
+            end = headers[position + 1].start() if position + 1 < len(headers) else len(response)
+            body = BATCH_END_RE.sub("", response[header.end():end])
+            blocks.setdefault(int(header.group(1)), body.strip())
+        return blocks
+
+    async def _analyze_vacancy_async(
+        self, gpt: AsyncGPTApiClient, text: str
+    ) -> Dict[str, str]:
+        gpt_request, response_format = self._analysis_request(text)
+        response = "N/A"
         for attempt in range(self.MAX_RETRIES):
             try:
-                gpt_request = f"{RECRUITMENT_PROMPT}{clean_text}"
-                response = self.gpt.get_text(gpt_request)
+                self.stats["requests"] += 1
+                response = await gpt.get_text(gpt_request, response_format=response_format)
                 return self._validate_response(response)
+            except GPTRequestError as e:
+                if self._format_rejected(e, response_format):
+                    gpt_request, response_format = self._analysis_request(text)
+                    continue
+                logger.error("Failed to process vacancy. Error: %s", e)
+                break
             except (GPTResponseFormatError, KeyError) as e:
-                logger.error("Attempt %d: Failed to process vacancy. Error: %s. Response: %s", 
-                             attempt + 1, e, response if 'response' in locals() else "N/A")
+                self.stats["format_errors"] += 1
+                logger.error("Attempt %d: Failed to process vacancy. Error: %s. Response: %s",
+                             attempt + 1, e, response)
+                gpt.discard_cached(gpt_request, response_format)
                 if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.RETRY_DELAY)
-        return {"vacancy": "false"}
+                    await asyncio.sleep(self._retry_delay(attempt))
+        return self._failed_result()
+
+    async def _generate_description_async(
+        self, gpt: AsyncGPTApiClient, text: str
+    ) -> Optional[str]:
+        try:
+            return await gpt.get_text(f"{TELEGRAM_CLEAR_PROMPT}{text}")
+        except GPTApiError as e:
+            logger.error("Failed to generate description. Error: %s", e)
+            return None
 
-    def generate_description(self, text: str) -> str:
+    def _analysis_request(self, text: str) -> Tuple[str, Optional[dict]]:
         """
-        Generates a refined description for vacancy posts using the Telegram clear prompt.
-        
-        Args:
-            text (str): The original vacancy content.
-        
-        Returns:
-            str: Refined vacancy description.
+        Returns the single-post analysis prompt and the response_format to request.
         """
-        gpt_request = f"{TELEGRAM_CLEAR_PROMPT}{text}"
-        return self.gpt.get_text(gpt_request)
+        clean_text = self._sanitize_text(text)
+        if self.structured:
+            return f"{RECRUITMENT_JSON_PROMPT}{clean_text}", ANALYSIS_RESPONSE_FORMAT
+        return f"{RECRUITMENT_PROMPT}{clean_text}", None
+
+    def _format_rejected(
+        self, error: GPTRequestError, response_format: Optional[dict]
+    ) -> bool:
+        """
+        Checks whether a request failed because the provider does not support
+        response_format. If so, switches to the plain prompts and the key:[value]
+        parser for the rest of the process, so the caller can retry once.
+        """
+        if not response_format or error.status_code not in self.FORMAT_REJECTED_STATUS_CODES:
+            return False
+        if self.structured:
+            logger.warning(
+                "Model %s rejected structured output (%s); using the plain prompts.",
+                OPENROUTER_MODEL,
+                error,
+            )
+        self.structured = False
+        self._plain_models.add(OPENROUTER_MODEL)
+        self.stats["format_rejected"] += 1
+        return True
+
+    def _failed_result(self) -> Dict[str, str]:
+        # Marked as failed so that it is not mistaken for a real "not a vacancy" answer.
+        return {"vacancy": "false", "status": "failed"}
+
+    def _retry_delay(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.RETRY_DELAY, self.MAX_RETRY_DELAY)
 
     def _sanitize_text(self, text: str) -> str:
         """
@@ -74,7 +288,7 @@ class GPTProcessor:
         # Remove specific email and phone data.
         return text.replace("ivan.danilov.wk@gmail.com", "").replace("+7 701 724 25 32", "")
 
-    def _validate_response(self, response: str) -> Dict[str, str]:
+    def _validate_response(self, response: Union[str, Dict[str, Any]]) -> Dict[str, str]:
         """
         Validates and parses the GPT response.
         
@@ -82,17 +296,60 @@ class GPTProcessor:
             GPTResponseFormatError: If required fields are missing or improperly formatted.
         
         Args:
-            response (str): The raw response from the GPT API.
+            response (Union[str, dict]): The raw response from the GPT API, or an
+                already decoded JSON result.
         
         Returns:
             dict: The parsed response as a dictionary.
         """
-        parsed = self._parse_response(response)
+        if self.structured or isinstance(response, dict):
+            parsed = self._parse_structured(response)
+        else:
+            parsed = self._parse_response(response)
         # Check if vacancy is true and credentials are missing.
         if parsed.get("vacancy") == "true" and parsed.get("credentials") == "na":
             raise GPTResponseFormatError("Missing credentials")
         return parsed
 
+    def _parse_structured(self, response: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Parses a JSON analysis result and validates it against VacancyAnalysis.
+
+        Near-valid JSON is repaired first; output without any JSON object falls back to
+        the key:[value] parser, so models ignoring response_format still work.
+
+        Raises:
+            GPTResponseFormatError: If the result does not validate.
+
+        Returns:
+            dict: Parsed fields in the same shape as _parse_response returns.
+        """
+        data = response if isinstance(response, dict) else self._decode_json(response)
+        if data is None:
+            self.stats["legacy"] += 1
+            return self._parse_response(response)
+        try:
+            return VacancyAnalysis.model_validate(data).to_fields()
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"]) or "result"
+            raise GPTResponseFormatError(f"{location}: {error['msg']}") from e
+
+    def _decode_json(self, text: str) -> Optional[Any]:
+        """
+        Decodes model output as JSON, repairing near-valid output when needed.
+
+        Returns:
+            The decoded object, or None if the text holds no usable JSON.
+        """
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = repair_json(text)
+            if data is not None:
+                self.stats["repaired"] += 1
+        return data if isinstance(data, (dict, list)) else None
+
     def _parse_response(self, response: str) -> Dict[str, str]:
         """
         Parses the GPT response into a dictionary of field/value pairs.
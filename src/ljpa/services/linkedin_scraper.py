@@ -1,24 +1,58 @@
 import json
 import logging
 import os
+import threading
 from getpass import getpass
-from time import sleep
-from typing import Dict, List, Optional, Tuple
+from time import perf_counter, time
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver import ChromeOptions
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from utilities.config import LINKEDIN_SEARCH_URL, RESOURCES_PATH, SELENIUM_COMMAND_EXECUTOR
+from db.repository import TextEntryRepository
+from services.screenshot_encoder import ScreenshotEncoder
+from utilities.config import (
+    LINKEDIN_CHECKPOINT_TIMEOUT,
+    LINKEDIN_INCREMENTAL,
+    LINKEDIN_MAX_SCROLLS,
+    LINKEDIN_SCROLLS,
+    LINKEDIN_SEARCH_URL,
+    LINKEDIN_SESSION_MARGIN,
+    RESOURCES_PATH,
+    SELENIUM_COMMAND_EXECUTOR,
+)
+from utilities.fingerprint import content_fingerprint
+from utilities.page_wait import AdaptiveWaiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scrapers running in parallel share one cookie file.
+_cookies_lock = threading.Lock()
+
+
+class ScrapedPost(NamedTuple):
+    """
+    A post read from a search results page. The element handle is only valid while
+    the scraper's browser session is open; screenshots are taken from it on demand.
+    """
+
+    text: str
+    urn: Optional[str]  # Stable post id (data-urn), None if the page did not expose one
+    element: WebElement
+    search_url: str
+
 
 class LinkedInScraper:
     """
@@ -28,11 +62,93 @@ class LinkedInScraper:
     LOGIN_URL = "https://www.linkedin.com/login"
     SEARCH_URL = LINKEDIN_SEARCH_URL
     COOKIES_PATH = os.path.join(RESOURCES_PATH, "linkedin_cookies.json")
+    # Static page of the domain, loaded only so the saved cookies can be set on it
+    COOKIE_DOMAIN_URL = "https://www.linkedin.com/robots.txt"
+    SESSION_COOKIE = "li_at"
+    LOGGED_OUT_MARKERS = ("/login", "/authwall", "/checkpoint", "/uas/")
+    CHECKPOINT_POLL = 2.0  # Seconds between checks while verification is pending
     SCREENSHOT_PATH = "/tmp/linkedin_error.png"
+    LOAD_TIMEOUT = 5.0  # Upper bound for each adaptive wait, in seconds
+    MAX_IDLE_SCROLLS = 2  # Scrolls in a row that read no new post before giving up
+    POST_CLASS_NAME = "fie-impression-container"
+    SEE_MORE_SELECTOR = ".feed-shared-inline-show-more-text__see-more-less-toggle > span"
+    # Expands every post not read before, lets the page re-render, then returns each
+    # such post's element, text, URN and page-relative bounding box, all in a single
+    # WebDriver round trip. Posts are marked as read, so later calls after scrolling
+    # only return the newly loaded ones (and never collapse an expanded post again).
+    EXTRACT_POSTS_SCRIPT = """
+        const [className, seeMoreSelector, done] = arguments;
+        const posts = Array.from(document.getElementsByClassName(className)).filter(
+            (post) => !post.dataset.ljpaRead
+        );
+        for (const post of posts) {
+            post.dataset.ljpaRead = "1";
+            const seeMore = post.querySelector(seeMoreSelector);
+            if (seeMore) seeMore.click();
+        }
+        const describe = (post) => {
+            const owner =
+                post.closest("[data-urn]") || post.querySelector("[data-urn]");
+            const rect = post.getBoundingClientRect();
+            return {
+                element: post,
+                text: post.innerText,
+                urn: owner ? owner.getAttribute("data-urn") : null,
+                rect: {
+                    x: rect.left + window.scrollX,
+                    y: rect.top + window.scrollY,
+                    width: rect.width,
+                    height: rect.height,
+                },
+            };
+        };
+        // Two frames give the expanded posts time to re-render before reading them;
+        // the timeout covers windows where animation frames are throttled.
+        let finished = false;
+        const finish = () => {
+            if (finished) return;
+            finished = true;
+            done(posts.map(describe));
+        };
+        requestAnimationFrame(() => requestAnimationFrame(finish));
+        setTimeout(finish, 250);
+    """
+    # Finds a post container again by its URN after its element handle went stale.
+    LOCATE_POST_SCRIPT = """
+        const [className, urn] = arguments;
+        const owner = document.querySelector(`[data-urn="${CSS.escape(urn)}"]`);
+        if (!owner) return null;
+        return owner.classList.contains(className)
+            ? owner
+            : owner.querySelector(`.${className}`) || owner.closest(`.${className}`);
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        search_url: Optional[str] = None,
+        command_executor: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            search_url (Optional[str]): Search opened on login, and scraped by
+                search_posts unless it is given another URL. Defaults to
+                LINKEDIN_SEARCH_URL.
+            command_executor (Optional[str]): Selenium server or Grid hub to start
+                the browser session on. Defaults to SELENIUM_COMMAND_EXECUTOR.
+        """
+        self.search_url = search_url or self.SEARCH_URL
+        self.command_executor = command_executor or SELENIUM_COMMAND_EXECUTOR
         self.driver: WebDriver = self._configure_driver()
         self.wait = WebDriverWait(self.driver, 15)
+        self.encoder = ScreenshotEncoder()
+        self.waiter = AdaptiveWaiter(self.driver)
+        self.repo = TextEntryRepository()
+        self._loaded_search_url: Optional[str] = None
+        # Browser tab per search URL, so posts of every search stay on a live page.
+        self._tabs: Dict[str, str] = {}
+        self._logged_in = False
+        # Set when the last login or search failed, so a warm session gets replaced.
+        self.failed = False
 
     def _configure_driver(self) -> WebDriver:
         """
@@ -45,7 +161,7 @@ class LinkedInScraper:
         options.add_argument("--remote-debugging-port=9222")
         options.add_argument("--verbose")
         return webdriver.Remote(
-            command_executor=SELENIUM_COMMAND_EXECUTOR, options=options
+            command_executor=self.command_executor, options=options
         )
 
     @staticmethod
@@ -57,59 +173,188 @@ class LinkedInScraper:
         password = os.getenv("LINKEDIN_PASSWORD") or getpass("LinkedIn password: ")
         return email, password
 
-    def _scroll_down(self, scroll_pause: float = 2.0, max_scrolls: int = 10) -> None:
+    def _scroll_down(self, scroll_pause: float = 2.0) -> bool:
         """
-        Scrolls down the page to load additional content.
+        Scrolls to the bottom of the page once and waits only until new posts appear
+        or the page grows.
 
         Args:
-            scroll_pause (float): Pause time between scrolls.
-            max_scrolls (int): Maximum number of scrolls.
+            scroll_pause (float): The fixed pause this wait replaces, for reporting.
+
+        Returns:
+            bool: True if new content loaded within the timeout.
         """
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        for _ in range(max_scrolls):
-            self.driver.execute_script(
-                "window.scrollTo(0, document.body.scrollHeight);"
-            )
-            sleep(scroll_pause)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        selector = f".{self.POST_CLASS_NAME}"
+        count, height = self.waiter.item_count(selector)
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        return self.waiter.for_growth(
+            selector, count, height, scroll_pause, timeout=self.LOAD_TIMEOUT
+        )
 
     def _save_cookies(self) -> None:
         """
         Saves the current session cookies to a file.
         """
-        with open(self.COOKIES_PATH, "w") as file:
-            json.dump(self.driver.get_cookies(), file)
+        cookies = self.driver.get_cookies()
+        with _cookies_lock, open(self.COOKIES_PATH, "w") as file:
+            json.dump(cookies, file)
         logger.info("Cookies saved to %s", self.COOKIES_PATH)
 
-    def _load_cookies(self) -> None:
+    def _load_cookies(self) -> List[Dict]:
         """
-        Loads session cookies from a file if available.
+        Loads the saved session cookies, dropping the ones that already expired.
+
+        Returns:
+            List[Dict]: The cookies, empty if none were saved.
         """
-        if os.path.exists(self.COOKIES_PATH):
+        with _cookies_lock:
+            if not os.path.exists(self.COOKIES_PATH):
+                return []
             with open(self.COOKIES_PATH, "r") as file:
                 cookies = json.load(file)
-                for cookie in cookies:
-                    self.driver.add_cookie(cookie)
-            logger.info("Cookies loaded from %s", self.COOKIES_PATH)
+        now = time()
+        return [cookie for cookie in cookies if cookie.get("expiry", now + 1) > now]
+
+    def _session_expiring(self, cookies: List[Dict]) -> bool:
+        """
+        Checks whether the session cookie is missing or expires within
+        LINKEDIN_SESSION_MARGIN, in which case logging in again is cheaper than
+        finding out mid-run that the session died.
+        """
+        session = next(
+            (cookie for cookie in cookies if cookie["name"] == self.SESSION_COOKIE),
+            None,
+        )
+        if session is None:
+            return True
+        expiry = session.get("expiry")
+        if expiry is None:
+            return False
+        remaining = expiry - time()
+        logger.info("LinkedIn session expires in %.1f hours.", remaining / 3600)
+        return remaining < LINKEDIN_SESSION_MARGIN
+
+    def _session_alive(self) -> bool:
+        """
+        Checks that the current page was served to a logged-in session, i.e. LinkedIn
+        did not redirect to a login, auth wall or checkpoint page.
+        """
+        url = self.driver.current_url
+        if any(marker in url for marker in self.LOGGED_OUT_MARKERS):
+            return False
+        return self.driver.get_cookie(self.SESSION_COOKIE) is not None
+
+    def _restore_session(self) -> bool:
+        """
+        Reuses the saved cookies by opening the search URL directly, skipping the
+        login page. Only a cookie-free page of the domain is loaded first, as the
+        browser accepts cookies only for the domain it is on.
+
+        Returns:
+            bool: True if the search page loaded for a logged-in session.
+        """
+        cookies = self._load_cookies()
+        if not cookies:
+            logger.info("No saved LinkedIn session.")
+            return False
+        if self._session_expiring(cookies):
+            logger.info("Saved LinkedIn session is missing or about to expire.")
+            return False
+
+        self.driver.get(self.COOKIE_DOMAIN_URL)
+        for cookie in cookies:
+            self.driver.add_cookie(cookie)
+        if not self._open_search_page():
+            logger.info("Saved LinkedIn session was rejected.")
+            return False
+
+        # LinkedIn rolls its cookies forward; keep the newest ones for the next run.
+        self._save_cookies()
+        return True
+
+    def _open_search_page(self) -> bool:
+        """
+        Opens the search URL and checks that it was served to a logged-in session.
+        search_posts then reads that page instead of loading it again.
+        """
+        self._switch_to_tab(self.search_url)
+        self.driver.get(self.search_url)
+        if not self._session_alive():
+            self._loaded_search_url = None
+            return False
+        self._loaded_search_url = self.search_url
+        return True
+
+    def _switch_to_tab(self, search_url: str) -> None:
+        """
+        Switches to the browser tab of a search URL. The first search uses the
+        initial window; every other search gets a tab of its own.
+        """
+        handle = self._tabs.get(search_url)
+        if handle is None:
+            if self._tabs:
+                self.driver.switch_to.new_window("tab")
+            self._tabs[search_url] = self.driver.current_window_handle
+        elif handle != self.driver.current_window_handle:
+            self.driver.switch_to.window(handle)
+
+    def _wait_for_checkpoint(self) -> bool:
+        """
+        Polls until the verification checkpoint is completed in the browser (the
+        page moves on to the feed), for at most LINKEDIN_CHECKPOINT_TIMEOUT seconds.
+
+        Returns:
+            bool: True if the checkpoint was completed in time.
+        """
+        logger.warning(
+            "Two-factor authentication required! Please complete verification "
+            "within %d seconds.",
+            LINKEDIN_CHECKPOINT_TIMEOUT,
+        )
+        started = perf_counter()
+        try:
+            WebDriverWait(
+                self.driver,
+                LINKEDIN_CHECKPOINT_TIMEOUT,
+                poll_frequency=self.CHECKPOINT_POLL,
+            ).until(lambda d: "feed" in d.current_url)
+        except TimeoutException:
+            logger.error("Verification was not completed in time.")
+            return False
+        logger.info("Verification completed after %.0fs.", perf_counter() - started)
+        return True
 
     def login(self) -> bool:
         """
-        Performs login on LinkedIn using saved cookies or by providing credentials.
+        Logs in to LinkedIn, reusing the saved session when it is still valid and
+        falling back to the credential flow only when it is not.
 
         Returns:
             bool: True if login is successful; False otherwise.
         """
+        logged_in = self._login()
+        self.failed = not logged_in
+        return logged_in
+
+    def _login(self) -> bool:
         try:
-            self.driver.get(self.LOGIN_URL)
-            self._load_cookies()
-            self.driver.refresh()
-            if "feed" in self.driver.current_url:
+            # A warm browser still holds the session of its previous login, unless
+            # its session cookie is about to expire.
+            if (
+                self._logged_in
+                and not self._session_expiring(self.driver.get_cookies())
+                and self._open_search_page()
+            ):
+                logger.info("Reusing the logged-in browser session.")
+                return True
+            self._logged_in = False
+            if self._restore_session():
                 logger.info("Already logged in.")
+                self._logged_in = True
                 return True
 
+            self.driver.delete_all_cookies()
+            self.driver.get(self.LOGIN_URL)
             email, password = self._get_credentials()
             self.wait.until(
                 EC.presence_of_element_located((By.ID, "username"))
@@ -124,51 +369,175 @@ class LinkedInScraper:
             )
 
             if "checkpoint/challenge" in self.driver.current_url:
-                logger.warning(
-                    "Two-factor authentication required! Please complete verification."
-                )
-                sleep(360)
+                if not self._wait_for_checkpoint():
+                    self._capture_screenshot()
+                    return False
 
             self._save_cookies()
             logger.info("Login successful!")
+            self._logged_in = True
             return True
         except Exception as err:
             logger.error("Login failed: %s", err)
             self._capture_screenshot()
             return False
 
-    def search_posts(self) -> Optional[Dict[str, bytes]]:
+    def search_posts(
+        self, search_url: Optional[str] = None
+    ) -> Optional[List[ScrapedPost]]:
         """
-        Searches for posts on LinkedIn by scrolling and extracting text and screenshots.
+        Searches for posts on LinkedIn, reading each batch of newly loaded posts and
+        scrolling for more. In incremental mode it stops at the first post whose URN is
+        in the search URL's watermark, i.e. one processed by an earlier run, so the
+        browser work is proportional to the number of new posts.
+
+        Args:
+            search_url (Optional[str]): The search to scrape, in its own tab.
+                Defaults to the scraper's search URL.
 
         Returns:
-            Optional[Dict[str, bytes]]: Dictionary mapping post text to screenshot PNG bytes,
-                                        or None if an error occurs.
+            Optional[List[ScrapedPost]]: New posts in feed order, or None if an error
+            occurs.
         """
+        search_url = search_url or self.search_url
         try:
-            self.driver.get(self.SEARCH_URL)
-            self._scroll_down(scroll_pause=2.0, max_scrolls=5)
-            sleep(5)  # Ensure page content is fully loaded
-            posts_elements = self.driver.find_elements(
-                By.CLASS_NAME, "fie-impression-container"
-            )
-            posts_data = {}
-            for post in posts_elements[:10]:
-                try:
-                    more_button = post.find_element(
-                        By.CSS_SELECTOR,
-                        ".feed-shared-inline-show-more-text__see-more-less-toggle > span",
+            watermark = set()
+            if LINKEDIN_INCREMENTAL:
+                watermark = self.repo.get_watermark(search_url)
+            self._switch_to_tab(search_url)
+            # Login already landed on the search page when it validated the session.
+            if self._loaded_search_url != search_url:
+                self.driver.get(search_url)
+            self._loaded_search_url = None
+            # Ensure page content is fully loaded
+            self.waiter.for_quiescence(baseline=5, timeout=self.LOAD_TIMEOUT)
+
+            posts = []
+            seen_hashes = set()
+            seen_urns = set()
+            reached_watermark = False
+            # The watermark can only stop the crawl once posts with a URN are matched
+            # against a non-empty one; until then the baseline scroll count applies.
+            urns_seen = False
+            scrolls = 0
+            idle_scrolls = 0
+            while True:
+                found = len(posts)
+                for post in self._extract_posts():
+                    urns_seen = urns_seen or bool(post["urn"])
+                    if post["urn"] in watermark:
+                        reached_watermark = True
+                        break
+                    text = post["text"]
+                    # The same post can show up more than once in the search feed.
+                    content_hash = content_fingerprint(text)
+                    if content_hash in seen_hashes or post["urn"] in seen_urns:
+                        logger.debug("Skipping duplicate post in search results.")
+                        continue
+                    seen_hashes.add(content_hash)
+                    if post["urn"]:
+                        seen_urns.add(post["urn"])
+                    posts.append(
+                        ScrapedPost(text, post["urn"], post["element"], search_url)
                     )
-                    # Expand the post if the "see more" button is present.
-                    self.driver.execute_script("arguments[0].click();", more_button)
-                except NoSuchElementException:
-                    logger.debug("No 'see more' button found for a post.")
-                posts_data[post.text] = post.screenshot_as_png
-            return posts_data
+                idle_scrolls = idle_scrolls + 1 if len(posts) == found else 0
+                max_scrolls = LINKEDIN_SCROLLS
+                if watermark and urns_seen:
+                    max_scrolls = LINKEDIN_MAX_SCROLLS
+                if (
+                    reached_watermark
+                    or scrolls >= max_scrolls
+                    or idle_scrolls >= self.MAX_IDLE_SCROLLS
+                ):
+                    break
+                scrolls += 1
+                if not self._scroll_down(scroll_pause=2.0):
+                    break
+
+            logger.info(
+                "Read %d new posts after %d scrolls%s.",
+                len(posts),
+                scrolls,
+                ", stopped at the watermark" if reached_watermark else "",
+            )
+            self.waiter.report("LinkedIn search")
+            return posts
         except Exception as err:
             logger.error("Failed to search posts: %s", err)
             self._capture_screenshot()
+            self.failed = True
+            return None
+
+    def capture_screenshots(self, posts: List[ScrapedPost]) -> List[Optional[bytes]]:
+        """
+        Screenshots the given posts, which must come from this session's last search
+        of their search URL; each is taken in its search's tab. Captures are
+        sequential WebDriver calls, while encoding runs on the encoder's pool in the
+        meantime.
+
+        Returns:
+            List[Optional[bytes]]: Encoded screenshots in the order of the posts, None
+            where the post could no longer be found on the page.
+        """
+        pending = []
+        for post in posts:
+            png = self._screenshot_post(post)
+            pending.append(self.encoder.submit(png) if png else None)
+        screenshots = [image.result() if image else None for image in pending]
+        logger.info(
+            "Captured %d of %d screenshots.",
+            sum(1 for screenshot in screenshots if screenshot),
+            len(posts),
+        )
+        self.encoder.report()
+        return screenshots
+
+    def _screenshot_post(self, post: ScrapedPost) -> Optional[bytes]:
+        """
+        Screenshots one post in its search's tab. Any WebDriver error (hidden or
+        zero-size element, timeout, closed tab) costs only this post's screenshot.
+        """
+        try:
+            self._switch_to_tab(post.search_url)
+            return self._capture_post(post)
+        except WebDriverException as err:
+            logger.warning("Could not screenshot post %s: %s", post.urn, err)
+            return None
+
+    def _capture_post(self, post: ScrapedPost) -> Optional[bytes]:
+        try:
+            return post.element.screenshot_as_png
+        except StaleElementReferenceException:
+            if not post.urn:
+                logger.warning("Post element went stale and has no URN to find it by.")
+                return None
+        element = self.driver.execute_script(
+            self.LOCATE_POST_SCRIPT, self.POST_CLASS_NAME, post.urn
+        )
+        if element is None:
+            logger.warning("Post %s is no longer on the page.", post.urn)
             return None
+        return element.screenshot_as_png
+
+    def _extract_posts(self) -> List[Dict]:
+        """
+        Expands and reads the posts not read before with one injected script.
+
+        Returns:
+            List[Dict]: Per post, in page order: "element" (WebElement, used for the
+            screenshot), "text", "urn" (None if the post has no data-urn) and "rect"
+            (x, y, width and height in page coordinates).
+        """
+        started = perf_counter()
+        posts = self.driver.execute_async_script(
+            self.EXTRACT_POSTS_SCRIPT, self.POST_CLASS_NAME, self.SEE_MORE_SELECTOR
+        )
+        logger.info(
+            "Extracted %d posts in one round trip (%.2fs).",
+            len(posts),
+            perf_counter() - started,
+        )
+        return posts
 
     def _capture_screenshot(self) -> None:
         """
@@ -177,39 +546,47 @@ class LinkedInScraper:
         self.driver.save_screenshot(self.SCREENSHOT_PATH)
         logger.error("Screenshot saved to %s", self.SCREENSHOT_PATH)
 
+    def healthy(self) -> bool:
+        """
+        Checks with a cheap round trip that the browser session still responds.
+        """
+        try:
+            return self.driver.execute_script("return document.readyState") is not None
+        except WebDriverException as err:
+            logger.warning("Browser session is unhealthy: %s", err)
+            return False
+
+    def heap_size_mb(self) -> Optional[float]:
+        """
+        Returns the JavaScript heap in use by the current page in MB, None if the
+        browser does not report it (performance.memory is Chromium-only).
+        """
+        try:
+            used = self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : null;"
+            )
+        except WebDriverException:
+            return None
+        return used / 2**20 if used else None
+
     def close(self) -> None:
         """
-        Closes the Selenium WebDriver session.
+        Closes the Selenium WebDriver session and the screenshot encoder.
         """
         self.driver.quit()
+        self.encoder.close()
 
+    def __enter__(self) -> "LinkedInScraper":
+        return self
 
-def start_linkedin_scraper() -> Optional[Dict[str, bytes]]:
-    """
-    Initializes the LinkedIn scraper, logs in, and performs a post search.
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
-    Returns:
-        Optional[Dict[str, bytes]]: The scraped posts data if successful, None otherwise.
-    """
-    scraper = LinkedInScraper()
-    try:
+
+if __name__ == "__main__":
+    with LinkedInScraper() as scraper:
         if scraper.login():
             posts = scraper.search_posts()
             if posts:
-                logger.info("Found %d posts.", len(posts))
-                return posts
-            else:
-                logger.warning("No posts found.")
-    finally:
-        scraper.close()
-    return None
-
-
-if __name__ == "__main__":
-    scraper = LinkedInScraper()
-    if scraper.login():
-        posts = scraper.search_posts()
-        if posts:
-            for post_text in posts.keys():
-                logger.info("Post: %s", post_text)
-        scraper.close()
+                for post in posts:
+                    logger.info("Post %s: %s", post.urn, post.text)
@@ -1,13 +1,21 @@
 import logging
-import os
-from datetime import datetime
-
-from services.telemessage import TelegramNotifier
+from typing import Dict, List, Optional, Set, Tuple
 
 from db.repository import TextEntryRepository
+from services.cv_matcher import CVMatcher
 from services.gpt_processor import GPTProcessor
-from services.linkedin_scraper import start_linkedin_scraper
-from utilities.file_handler import save_screenshot
+from services.linkedin_scraper import ScrapedPost
+from services.scraper_pool import create_scraper
+from services.scraper_session import ScraperSession
+from services.telegram_processor import TelegramProcessor
+from services.vacancy_classifier import VacancyPreClassifier
+from utilities.config import (
+    CV_MATCH_PREFILTER_ENABLED,
+    CV_MATCH_PREFILTER_THRESHOLD,
+    VACANCY_PREFILTER_ENABLED,
+)
+from utilities.file_handler import save_screenshot, screenshot_path_for
+from utilities.fingerprint import content_fingerprint
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,90 +31,165 @@ class LinkedInBot:
     def __init__(self):
         self.repo = TextEntryRepository()
         self.processor = GPTProcessor()
-        self.notifier = TelegramNotifier()
+        self.classifier = VacancyPreClassifier() if VACANCY_PREFILTER_ENABLED else None
+        self.matcher = CVMatcher()
 
-    def process_posts(self) -> None:
+    def process_posts(self, session: Optional[ScraperSession] = None) -> None:
         """
         Main workflow for processing LinkedIn posts.
-        Scrapes new posts, processes each vacancy, and sends notifications for unsent vacancies.
-        """
-        posts = start_linkedin_scraper()
-        if not posts:
-            logger.info("No new posts found.")
-            return
-
-        for vacancy_text, screenshot in posts.items():
-            self._process_single_post(vacancy_text, screenshot)
-
-        self._notify_unsent_vacancies()
-
-    def _process_single_post(self, vacancy_text: str, screenshot: bytes) -> None:
-        """
-        Processes a single LinkedIn post: analyzes it with GPT, saves a screenshot,
-        and creates a new entry in the repository.
+        Scrapes new posts, drops the ones already stored, the ones the local
+        pre-classifier rejects and the ones scoring low on the local CV match,
+        analyzes the remaining ones as one concurrent batch, advances the search
+        watermark past every post handled, and sends notifications for unsent vacancies.
 
         Args:
-            vacancy_text (str): The text content of the vacancy.
-            screenshot (bytes): Screenshot image in PNG format.
+            session (Optional[ScraperSession]): Warm browser session to scrape with;
+                without one, browsers are started for this run and quit afterwards.
         """
-        vacancy_data = self.processor.analyze_vacancy(vacancy_text)
-        screenshot_path = self._generate_screenshot_path()
+        with session.acquire() if session else create_scraper() as scraper:
+            if not scraper.login():
+                return
+            posts = scraper.search_posts()
+            if not posts:
+                logger.info("No new posts found.")
+                return
+
+            new_posts = self._filter_known_posts(posts)
+            texts = list(new_posts)
+            rejected = []
+            if self.classifier:
+                texts, rejected = self.classifier.split(texts)
+            texts, local_scores, low_match = self._rank_by_cv_match(texts)
+
+            analyses = self.processor.analyze_vacancies(texts)
+            # Only confirmed vacancies are stored with a screenshot, so the browser
+            # captures just those, while their elements are still on the page.
+            vacancies = [
+                text
+                for text, vacancy_data in zip(texts, analyses)
+                if vacancy_data.get("vacancy") == "true"
+            ]
+            screenshots = dict(
+                zip(
+                    vacancies,
+                    scraper.capture_screenshots([new_posts[t] for t in vacancies]),
+                )
+            )
+
+        stored = 0
+        for vacancy_text, vacancy_data in zip(texts, analyses):
+            if vacancy_text in local_scores:
+                vacancy_data["local_cv_match"] = local_scores[vacancy_text]
+            screenshot = screenshots.get(vacancy_text)
+            if self._process_single_post(vacancy_text, screenshot, vacancy_data):
+                stored += 1
+
+        failed = {
+            text
+            for text, vacancy_data in zip(texts, analyses)
+            if vacancy_data.get("status") == "failed"
+        }
+        self._advance_watermark(posts, failed)
+
+        logger.info(
+            "Run summary: %d scraped, %d skipped as already known, "
+            "%d rejected by pre-classifier, %d below local CV match, %d analyzed, %d stored.",
+            len(posts),
+            len(posts) - len(new_posts),
+            len(rejected),
+            low_match,
+            len(texts),
+            stored,
+        )
 
-        if self.repo.create_entry(vacancy_data, screenshot_path, vacancy_text):
-            save_screenshot(screenshot_path, screenshot)
-            logger.debug("Saved screenshot to %s", screenshot_path)
+        TelegramProcessor().notify_unsent_vacancies()
 
-    def _generate_screenshot_path(self) -> str:
+    def _filter_known_posts(self, posts: List[ScrapedPost]) -> Dict[str, ScrapedPost]:
         """
-        Generates a unique screenshot path using the current timestamp.
+        Removes posts that are already stored, using a single lookup on content hashes,
+        so that only unseen posts reach the GPT analysis stage. Posts found by more
+        than one search are merged here, keeping the first one by URN and by text.
+
+        Args:
+            posts (List[ScrapedPost]): Scraped posts.
 
         Returns:
-            str: The generated screenshot file path.
+            Dict[str, ScrapedPost]: The posts not yet stored, keyed by text.
         """
-        return os.path.join("screenshots", f"{datetime.now().timestamp()}.png")
-
-    def _notify_unsent_vacancies(self) -> None:
+        hashes = {post.text: content_fingerprint(post.text) for post in posts}
+        known = self.repo.find_existing_hashes(set(hashes.values()))
+        new_posts: Dict[str, ScrapedPost] = {}
+        seen_urns = set()
+        for post in posts:
+            if hashes[post.text] in known or post.text in new_posts:
+                continue
+            if post.urn in seen_urns:
+                continue
+            if post.urn:
+                seen_urns.add(post.urn)
+            new_posts[post.text] = post
+        return new_posts
+
+    def _advance_watermark(self, posts: List[ScrapedPost], failed: Set[str]) -> None:
         """
-        Notifies unsent vacancies via Telegram and marks them as sent in the repository.
+        Records the URNs of handled posts per search URL, so the next incremental
+        scrape stops when it reaches them. Posts whose analysis failed are left out
+        and get another chance while they are still above the watermark.
         """
-        unsent_vacancies = self.repo.get_unsent_vacancies()
-        for vacancy in unsent_vacancies:
-            self._send_vacancy_notification(vacancy)
-            self.repo.mark_as_sent(vacancy)
-
-    def _send_vacancy_notification(self, vacancy) -> None:
+        handled: Dict[str, List[str]] = {}
+        for post in posts:
+            if post.urn and post.text not in failed:
+                handled.setdefault(post.search_url, []).append(post.urn)
+        for search_url, urns in handled.items():
+            self.repo.extend_watermark(search_url, urns)
+
+    def _rank_by_cv_match(self, texts: List[str]) -> Tuple[List[str], Dict[str, float], int]:
         """
-        Sends a notification for a single vacancy.
-        Uses image-based caption and a message generated by the GPT processor.
+        Scores all texts against the CV locally in one batch and drops low matches.
 
         Args:
-            vacancy: Vacancy record, typically containing attributes like 'vacancy_title',
-                     'cv_match', 'visa_sponsorship', 'credentials', 'content', and 'screenshot_path'.
+            texts (List[str]): The candidate post texts.
+
+        Returns:
+            Tuple: The texts to analyze ordered by descending local score, the local
+            score per text, and the number of texts dropped.
         """
-        try:
-            caption = self._prepare_caption(vacancy)
-            description = self.processor.generate_description(vacancy.content)
-            self.notifier.send_image(vacancy.screenshot_path, caption)
-            self.notifier.send_message(description)
-        except Exception as e:
-            logger.error("Notification failed: %s", e)
-
-    def _prepare_caption(self, vacancy) -> str:
+        if not texts or not self.matcher.enabled:
+            return texts, {}, 0
+        scores = dict(zip(texts, self.matcher.score_batch(texts).round(2).tolist()))
+        ranked = sorted(texts, key=scores.get, reverse=True)
+        if not CV_MATCH_PREFILTER_ENABLED:
+            return ranked, scores, 0
+        kept = [text for text in ranked if scores[text] >= CV_MATCH_PREFILTER_THRESHOLD]
+        return kept, scores, len(texts) - len(kept)
+
+    def _process_single_post(
+        self,
+        vacancy_text: str,
+        screenshot: Optional[bytes],
+        vacancy_data: Dict[str, str],
+    ) -> bool:
         """
-        Prepares the caption text for Telegram notifications based on vacancy attributes.
+        Processes a single analyzed LinkedIn post: saves a screenshot and creates
+        a new entry in the repository.
 
         Args:
-            vacancy: Vacancy record containing relevant attributes.
+            vacancy_text (str): The text content of the vacancy.
+            screenshot (Optional[bytes]): Encoded screenshot image, None if the
+                post was not captured (not a vacancy, or capturing failed).
+            vacancy_data (Dict[str, str]): The GPT analysis of the post.
 
         Returns:
-            str: Formatted caption text.
+            bool: True if a new entry was stored.
         """
-        return (
-            f"Vacancy: {vacancy.vacancy_title}\n"
-            f"CV Match: {vacancy.cv_match}\n"
-            f"Visa Sponsorship: {vacancy.visa_sponsorship}\n"
-            f"Credentials: {vacancy.credentials}"
-        )
+        screenshot_path = screenshot_path_for(screenshot) if screenshot else ""
+
+        if self.repo.create_entry(vacancy_data, screenshot_path, vacancy_text):
+            if screenshot:
+                save_screenshot(screenshot)
+                logger.debug("Saved screenshot to %s", screenshot_path)
+            return True
+        return False
 
 
 if __name__ == "__main__":
@@ -1,13 +1,23 @@
+import argparse
+import logging
 import re
 
 from utilities.config import JOB_TITLE_EXTRACTOR_PROMPT
+from utilities.file_handler import remove_orphan_screenshots
 from db.database_setup import TextEntry
-from services.gpt_api_client import GPT4FreeInteraction
+from db.repository import NON_VACANCY_LABEL, TextEntryRepository
+from services.gpt_api_client import GPTApiClient
 
 
 def database_vacancy_title_update():
-    gpt_api = GPT4FreeInteraction()
-    for vacancy in TextEntry.select().where(TextEntry.vacancy_title == None):
+    gpt_api = GPTApiClient()
+    # Duplicates left without a content hash by the migration are not worth a GPT call.
+    query = TextEntry.select().where(
+        (TextEntry.vacancy_title == None)
+        & (TextEntry.content_hash.is_null(False))
+        & (TextEntry.spare3.is_null() | (TextEntry.spare3 != NON_VACANCY_LABEL))
+    )
+    for vacancy in query:
         GPT_REQUEST = JOB_TITLE_EXTRACTOR_PROMPT + vacancy.content
         vacancy_title = gpt_api.get_text(GPT_REQUEST)
         print(vacancy_title)
@@ -23,3 +33,22 @@ def extract_email(text: str) -> str:
     if match:
         return match.group(0)
     raise ValueError("No email found in the provided text")
+
+
+def collect_screenshot_garbage(dry_run: bool = False):
+    """Removes screenshots that no TextEntry row references any more."""
+    referenced = TextEntryRepository().get_screenshot_paths()
+    return remove_orphan_screenshots(referenced, dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Maintenance commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gc_parser = commands.add_parser(
+        "gc-screenshots", help="Delete screenshot files no database row references."
+    )
+    gc_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.command == "gc-screenshots":
+        collect_screenshot_garbage(dry_run=args.dry_run)
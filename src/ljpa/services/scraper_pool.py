@@ -0,0 +1,206 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Union
+
+from services.linkedin_scraper import LinkedInScraper, ScrapedPost
+from utilities.config import (
+    LINKEDIN_SCRAPE_PARALLELISM,
+    LINKEDIN_SEARCH_URLS,
+    SELENIUM_COMMAND_EXECUTORS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperPool:
+    """
+    Scrapes several LinkedIn searches concurrently, with one LinkedInScraper
+    (WebDriver session) per worker. Workers are spread round-robin over the Selenium
+    servers, or use one Grid hub that hands each session to a free node slot.
+
+    Searches are assigned to workers round-robin; a worker scrapes its searches one
+    after another, each in its own tab, so every post stays on a live page until its
+    screenshot is taken. The pool offers the same login, search_posts and
+    capture_screenshots calls as a single scraper.
+    """
+
+    def __init__(
+        self,
+        search_urls: Sequence[str] = LINKEDIN_SEARCH_URLS,
+        executors: Sequence[str] = SELENIUM_COMMAND_EXECUTORS,
+        parallelism: int = LINKEDIN_SCRAPE_PARALLELISM,
+    ):
+        self.search_urls = list(search_urls)
+        size = max(1, min(parallelism, len(self.search_urls)))
+        started = perf_counter()
+        with ThreadPoolExecutor(size) as executor:
+            futures = [
+                executor.submit(
+                    LinkedInScraper,
+                    self.search_urls[i],
+                    executors[i % len(executors)],
+                )
+                for i in range(size)
+            ]
+        self.workers: List[LinkedInScraper] = []
+        errors = []
+        for future in futures:
+            try:
+                self.workers.append(future.result())
+            except Exception as err:
+                logger.error("Failed to start a browser session: %s", err)
+                errors.append(err)
+        if not self.workers:
+            raise errors[0]
+        logger.info(
+            "Started %d of %d browser sessions in %.1fs.",
+            len(self.workers),
+            size,
+            perf_counter() - started,
+        )
+        # The worker whose tabs hold each search's posts.
+        self._owners: Dict[str, LinkedInScraper] = {}
+        # Set once a worker was dropped, so a warm pool is replaced at full size.
+        self._degraded = len(self.workers) < size
+
+    def login(self) -> bool:
+        """
+        Logs the first worker in (with credentials if need be, saving the cookies),
+        then the others in parallel from the saved session. Workers that fail to log
+        in are dropped.
+
+        Returns:
+            bool: True if at least the first worker is logged in.
+        """
+        if not self.workers[0].login():
+            return False
+        others = self.workers[1:]
+        with ThreadPoolExecutor(max(1, len(others))) as executor:
+            logged_in = list(executor.map(lambda worker: worker.login(), others))
+        for worker, ok in zip(others, logged_in):
+            if not ok:
+                logger.warning("Dropping a browser session that failed to log in.")
+                self._close_worker(worker)
+                self._degraded = True
+        return True
+
+    def search_posts(self) -> Optional[List[ScrapedPost]]:
+        """
+        Scrapes every search concurrently. Each search is deduplicated on its own;
+        posts found by several searches are kept once per search, so every search's
+        watermark advances, and are merged by the caller before analysis.
+
+        Returns:
+            Optional[List[ScrapedPost]]: New posts grouped by search in configured
+            order, or None if every search failed.
+        """
+        started = perf_counter()
+        self._owners = {}
+        assignments = {
+            worker: self.search_urls[i :: len(self.workers)]
+            for i, worker in enumerate(self.workers)
+        }
+        with ThreadPoolExecutor(len(self.workers)) as executor:
+            futures = {
+                worker: executor.submit(self._scrape_all, worker, search_urls)
+                for worker, search_urls in assignments.items()
+            }
+        results: Dict[str, List[ScrapedPost]] = {}
+        for worker, future in futures.items():
+            for search_url, posts in future.result().items():
+                if posts is None:
+                    continue
+                results[search_url] = posts
+                self._owners[search_url] = worker
+        if not results:
+            return None
+
+        posts = [post for url in self.search_urls for post in results.get(url, [])]
+        keys = {post.urn or post.text for post in posts}
+        logger.info(
+            "Scraped %d posts from %d of %d searches with %d sessions in %.1fs; "
+            "%d found by more than one search.",
+            len(posts),
+            len(results),
+            len(self.search_urls),
+            len(self.workers),
+            perf_counter() - started,
+            len(posts) - len(keys),
+        )
+        return posts
+
+    def capture_screenshots(self, posts: List[ScrapedPost]) -> List[Optional[bytes]]:
+        """
+        Screenshots the given posts, each by the worker that scraped it, with the
+        workers capturing in parallel.
+
+        Returns:
+            List[Optional[bytes]]: Encoded screenshots in the order of the posts, None
+            where a post could not be captured.
+        """
+        batches: Dict[LinkedInScraper, List[int]] = {}
+        for index, post in enumerate(posts):
+            batches.setdefault(self._owners[post.search_url], []).append(index)
+        screenshots: List[Optional[bytes]] = [None] * len(posts)
+        if not batches:
+            return screenshots
+        with ThreadPoolExecutor(len(batches)) as executor:
+            futures = {
+                executor.submit(
+                    worker.capture_screenshots, [posts[i] for i in indices]
+                ): indices
+                for worker, indices in batches.items()
+            }
+        for future, indices in futures.items():
+            for index, screenshot in zip(indices, future.result()):
+                screenshots[index] = screenshot
+        return screenshots
+
+    @property
+    def failed(self) -> bool:
+        """True if a worker's last login or search failed, or a worker was dropped."""
+        return self._degraded or any(worker.failed for worker in self.workers)
+
+    def healthy(self) -> bool:
+        """Checks that every worker's browser session still responds."""
+        return all(worker.healthy() for worker in self.workers)
+
+    def heap_size_mb(self) -> Optional[float]:
+        """Returns the largest JavaScript heap among the workers, in MB."""
+        heaps = [worker.heap_size_mb() for worker in self.workers]
+        heaps = [heap for heap in heaps if heap is not None]
+        return max(heaps) if heaps else None
+
+    def close(self) -> None:
+        """Closes every worker's browser session."""
+        for worker in list(self.workers):
+            self._close_worker(worker)
+
+    def _scrape_all(
+        self, worker: LinkedInScraper, search_urls: List[str]
+    ) -> Dict[str, Optional[List[ScrapedPost]]]:
+        return {url: worker.search_posts(url) for url in search_urls}
+
+    def _close_worker(self, worker: LinkedInScraper) -> None:
+        self.workers.remove(worker)
+        try:
+            worker.close()
+        except Exception as err:
+            logger.warning("Failed to quit a browser session: %s", err)
+
+    def __enter__(self) -> "ScraperPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def create_scraper() -> Union[LinkedInScraper, ScraperPool]:
+    """
+    Returns a single scraper for one configured search, or a pool scraping all of
+    them concurrently.
+    """
+    if len(LINKEDIN_SEARCH_URLS) > 1:
+        return ScraperPool()
+    return LinkedInScraper()
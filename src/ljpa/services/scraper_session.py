@@ -0,0 +1,114 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, Optional, Union
+
+from services.linkedin_scraper import LinkedInScraper
+from services.scraper_pool import ScraperPool, create_scraper
+from utilities.config import LINKEDIN_SESSION_MAX_HEAP_MB, LINKEDIN_SESSION_MAX_USES
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperSession:
+    """
+    Keeps one logged-in LinkedInScraper (or ScraperPool, for several searches) warm
+    between scheduled scrapes, so a scrape does not pay for new browser sessions and
+    a login every time.
+
+    The browser is health-checked before each use and recycled after `max_uses`
+    scrapes, when the page's JavaScript heap grows past `max_heap_mb`, or when a
+    login or scrape fails, whether it raised or only reported the failure.
+    """
+
+    def __init__(
+        self,
+        max_uses: int = LINKEDIN_SESSION_MAX_USES,
+        max_heap_mb: float = LINKEDIN_SESSION_MAX_HEAP_MB,
+    ):
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.scraper: Optional[Union[LinkedInScraper, ScraperPool]] = None
+        self.uses = 0
+        # Counters for sessions created, uses served by a warm session, sessions
+        # recycled (by use count, memory, failed health check, error or failed run)
+        # and the seconds spent creating sessions.
+        self.stats: Counter = Counter()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Union[LinkedInScraper, ScraperPool]]:
+        """
+        Lends out the warm scraper, creating a new one if there is none or the
+        current one failed its health check.
+        """
+        scraper = self._checkout()
+        try:
+            yield scraper
+        except Exception:
+            self._recycle("error")
+            raise
+        self._checkin()
+
+    def close(self) -> None:
+        """Quits the warm browser session, if any, and logs the reuse stats."""
+        if self.scraper is not None:
+            self.scraper.close()
+            self.scraper = None
+        self.report()
+
+    def report(self) -> None:
+        logger.info(
+            "Scraper sessions: %d created in %.1fs, %d uses served warm; recycled "
+            "%d by use count, %d by memory, %d unhealthy, %d after errors, "
+            "%d after failed runs.",
+            self.stats["created"],
+            self.stats["startup_seconds"],
+            self.stats["reused"],
+            self.stats["recycled_uses"],
+            self.stats["recycled_memory"],
+            self.stats["recycled_unhealthy"],
+            self.stats["recycled_error"],
+            self.stats["recycled_failed"],
+        )
+
+    def _checkout(self) -> Union[LinkedInScraper, ScraperPool]:
+        if self.scraper is not None and not self.scraper.healthy():
+            self._recycle("unhealthy")
+        if self.scraper is None:
+            started = perf_counter()
+            self.scraper = create_scraper()
+            elapsed = perf_counter() - started
+            self.stats["created"] += 1
+            self.stats["startup_seconds"] += elapsed
+            logger.info("Started a new browser session in %.1fs.", elapsed)
+        else:
+            self.stats["reused"] += 1
+            logger.info("Reusing the warm browser session (use %d).", self.uses + 1)
+        self.uses += 1
+        return self.scraper
+
+    def _checkin(self) -> None:
+        # A logged-out browser or one stuck on a checkpoint is still "healthy".
+        if self.scraper.failed:
+            self._recycle("failed")
+            return
+        if self.uses >= self.max_uses:
+            self._recycle("uses")
+            return
+        heap = self.scraper.heap_size_mb()
+        if heap is not None and heap > self.max_heap_mb:
+            logger.info("Browser heap at %.0f MB.", heap)
+            self._recycle("memory")
+
+    def _recycle(self, reason: str) -> None:
+        logger.info(
+            "Recycling the browser session after %d uses (%s).", self.uses, reason
+        )
+        self.stats[f"recycled_{reason}"] += 1
+        try:
+            self.scraper.close()
+        except Exception as err:
+            logger.warning("Failed to quit the browser session: %s", err)
+        self.scraper = None
+        self.uses = 0
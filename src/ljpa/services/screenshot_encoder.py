@@ -0,0 +1,110 @@
+import io
+import logging
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PIL import Image
+
+from utilities.config import (
+    SCREENSHOT_ENCODE_WORKERS,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_MAX_WIDTH,
+    SCREENSHOT_QUALITY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenshotEncoder:
+    """
+    Re-encodes captured PNG screenshots into a smaller format on a thread pool, so the
+    scraping thread only hands the bytes over and moves on to the next post.
+
+    Images wider than max_width are downscaled, and only pixel data is written out, so
+    no metadata (text chunks, ICC profiles, EXIF) survives. With the "png" format the
+    original bytes are returned untouched, as they are whenever re-encoding would not
+    make the image smaller.
+    """
+
+    FORMATS = {"jpeg": "JPEG", "webp": "WEBP", "png": "PNG"}
+
+    def __init__(
+        self,
+        image_format: str = SCREENSHOT_FORMAT,
+        quality: int = SCREENSHOT_QUALITY,
+        max_width: int = SCREENSHOT_MAX_WIDTH,
+        workers: int = SCREENSHOT_ENCODE_WORKERS,
+    ):
+        if image_format not in self.FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self.image_format = image_format
+        self.quality = quality
+        self.max_width = max_width
+        # Counters for images encoded, bytes before and after, encode milliseconds and
+        # images kept as the original PNG.
+        self.stats: Counter = Counter()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="screenshot-encoder"
+        )
+
+    def submit(self, png: bytes) -> Future:
+        """Queues a PNG screenshot for encoding; the Future resolves to the new bytes."""
+        return self._pool.submit(self.encode, png)
+
+    def encode(self, png: bytes) -> bytes:
+        """Encodes a PNG screenshot with the configured format, quality and width."""
+        if self.image_format == "png":
+            return png
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(png)) as image:
+            image = image.convert("RGB")
+            if self.max_width and image.width > self.max_width:
+                height = round(image.height * self.max_width / image.width)
+                image = image.resize((self.max_width, height), Image.LANCZOS)
+            output = io.BytesIO()
+            image.save(
+                output,
+                format=self.FORMATS[self.image_format],
+                quality=self.quality,
+                optimize=True,
+            )
+        encoded = output.getvalue()
+        if len(encoded) >= len(png):
+            # Dense text can compress better as PNG; keep whichever is smaller.
+            encoded = png
+            self.stats["kept_original"] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.stats["images"] += 1
+        self.stats["bytes_in"] += len(png)
+        self.stats["bytes_out"] += len(encoded)
+        self.stats["encode_ms"] += elapsed_ms
+        logger.debug(
+            "Encoded screenshot %d -> %d bytes in %.1f ms",
+            len(png),
+            len(encoded),
+            elapsed_ms,
+        )
+        return encoded
+
+    def report(self) -> None:
+        """Logs bytes saved and average encode time over all images so far."""
+        images = self.stats["images"]
+        if not images:
+            return
+        bytes_in, bytes_out = self.stats["bytes_in"], self.stats["bytes_out"]
+        logger.info(
+            "Encoded %d screenshot(s) to %s (%d kept as PNG): %.1f KiB -> %.1f KiB "
+            "(%.0f%% saved), %.1f ms per image.",
+            images,
+            self.image_format,
+            self.stats["kept_original"],
+            bytes_in / 1024,
+            bytes_out / 1024,
+            100 * (bytes_in - bytes_out) / bytes_in,
+            self.stats["encode_ms"] / images,
+        )
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -1,9 +1,19 @@
 import logging
-from typing import Any
+import os
+import re
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional, Tuple
 
 from db.repository import TextEntryRepository
 from services.gpt_processor import GPTProcessor
-from services.telemessage import TelegramNotifier
+from services.telemessage import get_notifier
+from utilities.config import (
+    TELEGRAM_DIGEST_ENABLED,
+    TELEGRAM_DIGEST_GROUP_BY,
+    TELEGRAM_DIGEST_SCORE_BANDS,
+    TELEGRAM_DIGEST_WINDOW_DAYS,
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -12,39 +22,227 @@ logging.basicConfig(level=logging.INFO)
 class TelegramProcessor:
     """Processes and sends unsent vacancy notifications via Telegram."""
 
+    ALBUM_SIZE = 10  # Telegram's media group limit
+    CAPTION_LIMIT = 1024
+    MESSAGE_LIMIT = 4096
+
     def __init__(self) -> None:
         self.repo = TextEntryRepository()
         self.gpt_processor = GPTProcessor()
-        self.notifier = TelegramNotifier()
+        self.notifier = get_notifier()
 
     def notify_unsent_vacancies(self) -> None:
         """Notify all unsent vacancies using Telegram."""
-        vacancies = self.repo.get_unsent_vacancies()
+        vacancies = list(self.repo.get_unsent_vacancies())
         if not vacancies:
             logger.info("No unsent vacancies to notify.")
             return
 
         logger.info("Notifying %d unsent vacancies...", len(vacancies))
 
-        for vacancy in vacancies:
-            success = self._send_vacancy_notification(vacancy)
-            if success:
+        if TELEGRAM_DIGEST_ENABLED:
+            self.send_digest(vacancies)
+            return
+
+        # Descriptions are generated concurrently up front; the notifier's queue then
+        # delivers everything in order while we only wait for the outcomes.
+        descriptions = self.gpt_processor.generate_descriptions(
+            [vacancy.content for vacancy in vacancies]
+        )
+        queued = []
+        for vacancy, description in zip(vacancies, descriptions):
+            if description is None:
+                # Left unsent so that the next run tries again.
+                logger.error("No description for %s, skipping.", vacancy.vacancy_title)
+                continue
+            deliveries = self._send_vacancy_notification(vacancy, description)
+            queued.append((vacancy, deliveries))
+
+        for vacancy, deliveries in queued:
+            if self._delivered(vacancy, deliveries):
                 self.repo.mark_as_sent(vacancy)
 
-    def _send_vacancy_notification(self, vacancy: Any) -> bool:
-        """Send a Telegram notification for a single vacancy."""
+    def _send_vacancy_notification(
+        self, vacancy: Any, description: str
+    ) -> List[Future]:
+        """
+        Queue the Telegram notification for a single vacancy. Vacancies stored without
+        a screenshot (capturing failed) get the caption as a text message instead.
+        """
+        caption = self._prepare_caption(vacancy)
+        if vacancy.screenshot_path and os.path.isfile(vacancy.screenshot_path):
+            first = self.notifier.send_image(vacancy.screenshot_path, caption)
+        else:
+            first = self.notifier.send_message(caption)
+        return [first, self.notifier.send_message(description)]
+
+    def _delivered(self, vacancy: Any, deliveries: List[Future]) -> bool:
+        """Wait for a vacancy's queued messages and report whether all went out."""
         try:
-            caption = self._prepare_caption(vacancy)
-            description = self.gpt_processor.generate_description(vacancy.content)
+            for delivery in deliveries:
+                delivery.result()
+        except Exception as e:
+            logger.error("Notification failed for %s: %s", vacancy.vacancy_title, str(e))
+            return False
+        logger.info("Notification sent for: %s", vacancy.vacancy_title)
+        return True
+
+    def send_digest(self, vacancies: List[Any]) -> int:
+        """
+        Sends the vacancies as a digest: one summary message followed by albums of up
+        to ten screenshots per group, without generating GPT descriptions. Rows whose
+        album (or, without a screenshot, the summary) was delivered are marked sent
+        in one update.
+
+        Returns:
+            int: The number of vacancies marked as sent.
+        """
+        groups = self._group_vacancies(vacancies)
+        summary_deliveries = [
+            self.notifier.send_message(chunk)
+            for chunk in self._chunk_lines(self._digest_summary(groups))
+        ]
+
+        queued: List[Tuple[List[Any], Future]] = []
+        text_only = []
+        for _, members in groups:
+            with_image = []
+            for vacancy in members:
+                if os.path.isfile(vacancy.screenshot_path):
+                    with_image.append(vacancy)
+                else:
+                    text_only.append(vacancy)
+            for start in range(0, len(with_image), self.ALBUM_SIZE):
+                album = with_image[start : start + self.ALBUM_SIZE]
+                queued.append((album, self._send_album(album)))
 
-            self.notifier.send_image(vacancy.screenshot_path, caption)
-            self.notifier.send_message(description)
+        delivered = []
+        if self._delivered_all(summary_deliveries, "digest summary"):
+            delivered.extend(text_only)
+        for album, delivery in queued:
+            if self._delivered_all([delivery], f"album of {len(album)}"):
+                delivered.extend(album)
 
-            logger.info("Notification sent for: %s", vacancy.vacancy_title)
-            return True
+        marked = self.repo.mark_many_as_sent(delivered)
+        logger.info(
+            "Digest sent: %d of %d vacancies in %d album(s) and %d summary message(s).",
+            marked,
+            len(vacancies),
+            len(queued),
+            len(summary_deliveries),
+        )
+        return marked
+
+    def _send_album(self, album: List[Any]) -> Future:
+        """Queue an album, or a single photo since media groups need two items."""
+        images = [
+            (
+                vacancy.screenshot_path,
+                self._prepare_caption(vacancy)[: self.CAPTION_LIMIT],
+            )
+            for vacancy in album
+        ]
+        if len(images) == 1:
+            return self.notifier.send_image(*images[0])
+        return self.notifier.send_media_group(images)
+
+    def _delivered_all(self, deliveries: List[Future], label: str) -> bool:
+        """Wait for queued sends and report whether all of them went out."""
+        try:
+            for delivery in deliveries:
+                delivery.result()
         except Exception as e:
-            logger.error("Notification failed for %s: %s", vacancy.vacancy_title, str(e))
+            logger.error("Digest %s failed: %s", label, str(e))
             return False
+        return True
+
+    def _group_vacancies(self, vacancies: List[Any]) -> List[Tuple[str, List[Any]]]:
+        """
+        Group vacancies by CV match band or by creation date window, best band or most
+        recent window first; vacancies without a readable date come last.
+        """
+        groups = {}
+        if TELEGRAM_DIGEST_GROUP_BY == "date":
+            window = max(1, TELEGRAM_DIGEST_WINDOW_DAYS)
+            undated = []
+            for vacancy in vacancies:
+                created = self._parse_created_date(vacancy.created_date)
+                if created is None:
+                    undated.append(vacancy)
+                    continue
+                start = created.toordinal() // window * window
+                groups.setdefault(date.fromordinal(start), []).append(vacancy)
+            labelled = []
+            for start, members in sorted(groups.items(), reverse=True):
+                end = start + timedelta(days=window - 1)
+                label = str(start) if window == 1 else f"{start} to {end}"
+                labelled.append((label, members))
+            if undated:
+                labelled.append(("Unknown date", undated))
+            return labelled
+
+        bands = sorted(TELEGRAM_DIGEST_SCORE_BANDS, reverse=True)
+        for vacancy in vacancies:
+            score = self._parse_score(vacancy.cv_match)
+            band = next((b for b in bands if score is not None and score >= b), None)
+            groups.setdefault(band, []).append(vacancy)
+        labelled = []
+        for band in bands:
+            if band in groups:
+                labelled.append((f"CV match {band}%+", groups[band]))
+        if None in groups:
+            labelled.append(("Lower or unscored CV match", groups[None]))
+        return labelled
+
+    def _digest_summary(self, groups: List[Tuple[str, List[Any]]]) -> List[str]:
+        """Build the summary lines: a header per group and one line per vacancy."""
+        total = sum(len(members) for _, members in groups)
+        lines = [f"Vacancy digest: {total} new vacancies"]
+        number = 0
+        for label, members in groups:
+            lines.append("")
+            lines.append(f"{label} ({len(members)})")
+            for vacancy in members:
+                number += 1
+                lines.append(
+                    f"{number}. {vacancy.vacancy_title} | CV {vacancy.cv_match} | "
+                    f"Visa: {vacancy.visa_sponsorship} | {vacancy.credentials}"
+                )
+        return lines
+
+    def _chunk_lines(self, lines: List[str]) -> List[str]:
+        """Join lines into as few messages as fit Telegram's message length limit."""
+        chunks, current = [], ""
+        for line in lines:
+            line = line[: self.MESSAGE_LIMIT]
+            if current and len(current) + len(line) + 1 > self.MESSAGE_LIMIT:
+                chunks.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _parse_created_date(created_date: Any) -> Optional[date]:
+        """
+        Read created_date, which the repository stores as a "%Y-%m-%d-%H-%M-%S" string
+        that peewee's DateField hands back unparsed.
+        """
+        if isinstance(created_date, datetime):
+            return created_date.date()
+        if isinstance(created_date, date):
+            return created_date
+        try:
+            return datetime.strptime(str(created_date)[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_score(cv_match: Any) -> Optional[int]:
+        match = re.search(r"\d+", str(cv_match or ""))
+        return int(match.group()) if match else None
 
     def _prepare_caption(self, vacancy: Any) -> str:
         """Generate the caption text shown with the Telegram image."""
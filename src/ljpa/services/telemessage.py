@@ -1,42 +1,273 @@
 import asyncio
+import atexit
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from datetime import timedelta
+from contextlib import ExitStack
+from typing import Awaitable, Callable, List, Optional, Tuple
 
-from telegram import Bot
+from telegram import Bot, InputMediaPhoto
+from telegram.error import BadRequest, NetworkError, RetryAfter
 
-from utilities.config import BOT_TOKEN, CHAT_ID
+from db.repository import TextEntryRepository
+from utilities.config import (
+    BOT_TOKEN,
+    CHAT_ID,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MAX_RETRIES,
+)
+from utilities.fingerprint import file_fingerprint
+from utilities.rate_limit import TokenBucket
+from utilities.retry import backoff_delay
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+_shared_notifier = None
+
+
+def get_notifier() -> "TelegramNotifier":
+    """Returns the notifier shared by every service, so a run uses one bot session."""
+    global _shared_notifier
+    if _shared_notifier is None:
+        _shared_notifier = TelegramNotifier()
+    return _shared_notifier
+
 
 class TelegramNotifier:
-    """Handles sending messages and images via Telegram bot."""
+    """
+    Handles sending messages and images via Telegram bot.
+
+    A background thread owns one event loop and one initialized Bot session for the
+    lifetime of the notifier. send_message/send_image only enqueue the request and
+    return a Future; a single worker delivers the queue in order, paced by a global and
+    a per-chat token bucket, waiting out 429 retry_after responses and retrying network
+    errors with backoff.
+    """
 
     def __init__(self):
         if not BOT_TOKEN or not CHAT_ID:
             raise ValueError("BOT_TOKEN or CHAT_ID is not set.")
         self.bot = Bot(token=BOT_TOKEN)
         self.chat_id = CHAT_ID
+        self.repo = TextEntryRepository()
+        # Counters for delivered, failed, throttled (429) and retried sends, and for
+        # images uploaded versus sent by a stored file_id.
+        self.stats: Counter = Counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+        self._lock = threading.Lock()
 
-    def send_message(self, message: str) -> None:
-        """Sends a plain text message to Telegram."""
-        asyncio.run(self._async_send(self.bot.send_message, text=message))
+    def send_message(self, message: str) -> Future:
+        """Queues a plain text message for Telegram."""
+        return self._submit(
+            lambda: self.bot.send_message(chat_id=self.chat_id, text=message),
+            "message",
+        )
 
-    def send_image(self, image_path: str, caption: str = "") -> None:
-        """Sends an image with optional caption to Telegram."""
+    def send_image(self, image_path: str, caption: str = "") -> Future:
+        """
+        Queues an image with optional caption for Telegram. An image uploaded before
+        (same content hash) is sent by its stored file_id instead of being re-uploaded.
+        """
 
         async def send_photo():
+            content_hash = file_fingerprint(image_path)
+            file_id = self.repo.get_telegram_file_id(content_hash)
+            if file_id:
+                try:
+                    message = await self.bot.send_photo(
+                        chat_id=self.chat_id, photo=file_id, caption=caption
+                    )
+                    self.stats["reused"] += 1
+                    return message
+                except BadRequest as e:
+                    logger.warning("Stored file_id rejected (%s), uploading again.", e)
+                    self.repo.forget_telegram_file_id(content_hash)
             with open(image_path, "rb") as image:
-                return await self.bot.send_photo(
+                message = await self.bot.send_photo(
                     chat_id=self.chat_id, photo=image, caption=caption
                 )
+            self._remember_upload(content_hash, message)
+            return message
+
+        return self._submit(send_photo, "image")
+
+    def send_media_group(self, images: List[Tuple[str, str]]) -> Future:
+        """
+        Queues an album of 2 to 10 (image_path, caption) pairs, sent as one request.
+        Images uploaded before are referenced by their stored file_id.
+        """
+
+        async def send_album():
+            hashes = [file_fingerprint(image_path) for image_path, _ in images]
+            file_ids = [self.repo.get_telegram_file_id(h) for h in hashes]
+            if any(file_ids):
+                try:
+                    messages = await self._send_album(images, file_ids)
+                except BadRequest as e:
+                    logger.warning("Stored file_ids rejected (%s), uploading again.", e)
+                    for content_hash, file_id in zip(hashes, file_ids):
+                        if file_id:
+                            self.repo.forget_telegram_file_id(content_hash)
+                    file_ids = [None] * len(images)
+                else:
+                    self.stats["reused"] += sum(1 for file_id in file_ids if file_id)
+            if not any(file_ids):
+                messages = await self._send_album(images, file_ids)
+            for content_hash, file_id, message in zip(hashes, file_ids, messages):
+                if not file_id:
+                    self._remember_upload(content_hash, message)
+            return messages
+
+        return self._submit(send_album, "album")
+
+    async def _send_album(
+        self, images: List[Tuple[str, str]], file_ids: List[Optional[str]]
+    ):
+        with ExitStack() as stack:
+            media = [
+                InputMediaPhoto(
+                    media=file_id or stack.enter_context(open(image_path, "rb")),
+                    caption=caption,
+                )
+                for (image_path, caption), file_id in zip(images, file_ids)
+            ]
+            return await self.bot.send_media_group(chat_id=self.chat_id, media=media)
+
+    def _remember_upload(self, content_hash: str, message) -> None:
+        """Stores the file_id of the largest photo size Telegram kept for an upload."""
+        self.stats["uploaded"] += 1
+        if message.photo:
+            self.repo.save_telegram_file_id(content_hash, message.photo[-1].file_id)
+
+    def start(self) -> None:
+        """Starts the delivery thread and initializes the bot session, once."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._startup_error = None
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run, name="telegram-notifier", daemon=True
+            )
+            self._thread.start()
+            self._ready.wait()
+            if self._startup_error is not None:
+                self._thread.join()
+                raise self._startup_error
+            atexit.register(self.close)
 
-        asyncio.run(self._async_send(send_photo))
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Delivers everything still queued, then shuts the bot session down."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+            self._thread.join(timeout)
+            logger.info(
+                "Telegram notifier closed: %d sent, %d failed, %d throttled, "
+                "%d retried; %d images uploaded, %d reused by file_id.",
+                self.stats["sent"],
+                self.stats["failed"],
+                self.stats["throttled"],
+                self.stats["retried"],
+                self.stats["uploaded"],
+                self.stats["reused"],
+            )
 
-    async def _async_send(self, message) -> None:
-        async with self.bot:
+    def _submit(self, send: Callable[[], Awaitable], label: str) -> Future:
+        self.start()
+        future: Future = Future()
+        self._loop.call_soon_threadsafe(
+            self._queue.put_nowait, (future, send, label)
+        )
+        return future
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        # Created inside the loop: asyncio primitives bind to it on Python 3.9.
+        self._queue = asyncio.Queue()
+        global_bucket = TokenBucket(TELEGRAM_GLOBAL_RATE)
+        chat_bucket = TokenBucket(TELEGRAM_CHAT_RATE)
+        try:
+            await self.bot.initialize()
+        except BaseException as e:
+            self._startup_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            while True:
+                job = await self._queue.get()
+                if job is None:
+                    break
+                future, send, label = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = await self._deliver(
+                        send, label, chat_bucket, global_bucket
+                    )
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    logger.error("Failed to send %s: %s", label, e)
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            await self.bot.shutdown()
+
+    async def _deliver(
+        self,
+        send: Callable[[], Awaitable],
+        label: str,
+        chat_bucket: TokenBucket,
+        global_bucket: TokenBucket,
+    ):
+        attempt = 0
+        while True:
+            await chat_bucket.acquire()
+            await global_bucket.acquire()
             try:
-                await self.bot.send_message(chat_id=self.chat_id, text=message)
-                logger.info("Message sent successfully.")
-            except Exception as e:
-                logger.error(f"Failed to send message: {e}")
+                result = await send()
+                self.stats["sent"] += 1
+                logger.info("Telegram %s sent successfully.", label)
+                return result
+            except RetryAfter as e:
+                if attempt >= TELEGRAM_MAX_RETRIES:
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                self.stats["throttled"] += 1
+                logger.warning("Telegram rate limit hit, waiting %ss.", delay)
+                # Nothing else may go out while Telegram is throttling us.
+                chat_bucket.drain()
+                global_bucket.drain()
+                await asyncio.sleep(delay)
+            except BadRequest:
+                raise
+            except NetworkError as e:
+                if attempt >= TELEGRAM_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt, 1, 30)
+                self.stats["retried"] += 1
+                logger.warning(
+                    "Telegram %s failed (%s), retrying in %.1fs.", label, e, delay
+                )
+                await asyncio.sleep(delay)
+            attempt += 1
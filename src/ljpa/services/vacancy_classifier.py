@@ -0,0 +1,145 @@
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from utilities.config import VACANCY_PREFILTER_THRESHOLD
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# (pattern, weight): positive weights point to a job vacancy, negative ones away from it.
+FEATURES: List[Tuple[str, float]] = [
+    (r"\b(we\s*(?:'re|are)\s+hiring|#hiring|now hiring|is hiring)\b", 2.5),
+    (r"\b(vacanc(?:y|ies)|job opening|open position|open role|opportunit(?:y|ies))\b", 1.5),
+    (r"\b(looking for|searching for|seeking)\s+(?:an?\s+)?(?:experienced\s+|senior\s+|junior\s+)?\w*\s*(engineer|developer|technician|specialist|manager|programmer)", 2.0),
+    (r"\b(requirements?|qualifications?|responsibilities|what you(?:'ll| will) do)\b", 1.5),
+    (r"\b\d+\+?\s*(?:years?|yrs)\b.{0,20}\bexperience\b", 1.5),
+    (r"\b(apply|application|send (?:your|us your) (?:cv|resume)|submit (?:your )?(?:cv|resume))\b", 1.5),
+    (r"\b(full[- ]time|part[- ]time|contract|permanent|on[- ]site|remote|hybrid)\b", 0.8),
+    (r"\b(salary|compensation|benefits|relocation|visa sponsorship)\b", 1.0),
+    (r"\b(join (?:our|the) team|recruit(?:ing|er|ment)?)\b", 1.0),
+    (r"[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}", 1.0),
+    (r"(#opentowork|open to work|i(?:'m| am) (?:currently )?(?:looking|searching) for (?:a )?(?:new )?(?:job|role|position|opportunit))", -3.0),
+    (r"\b(seeking new opportunities|available for hire|my (?:cv|resume) is attached)\b", -2.0),
+    (r"\b(congratulations|congrats|happy to share|excited to share|proud to announce|thrilled to)\b", -1.5),
+    (r"\b(webinar|course|certificat(?:e|ion)|workshop|conference|tutorial)\b", -1.0),
+]
+BIAS = -2.0
+
+_COMPILED = [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in FEATURES]
+
+
+class VacancyPreClassifier:
+    """
+    Cheap local first pass in front of the GPT vacancy analysis.
+
+    Scores a post with weighted keyword/regex features and a logistic function. Posts
+    scoring below the threshold are confidently not vacancies and are rejected without
+    a GPT call; ambiguous and likely-vacancy posts are passed on.
+    """
+
+    def __init__(self, threshold: float = VACANCY_PREFILTER_THRESHOLD) -> None:
+        self.threshold = threshold
+
+    def score(self, text: str) -> float:
+        """
+        Returns the estimated probability that the text is a job vacancy.
+        """
+        total = BIAS
+        for pattern, weight in _COMPILED:
+            if pattern.search(text):
+                total += weight
+        return 1 / (1 + math.exp(-total))
+
+    def is_candidate(self, text: str) -> bool:
+        """
+        Returns True if the post should be analyzed by GPT.
+        """
+        return self.score(text) >= self.threshold
+
+    def split(self, texts: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Splits texts into (candidates, rejected) according to the threshold.
+        """
+        candidates, rejected = [], []
+        for text in texts:
+            (candidates if self.is_candidate(text) else rejected).append(text)
+        return candidates, rejected
+
+    def evaluate(self, labelled: Iterable[Tuple[str, bool]]) -> Dict[str, float]:
+        """
+        Measures the classifier against labelled posts.
+
+        Args:
+            labelled (Iterable[Tuple[str, bool]]): (text, is_vacancy) pairs.
+
+        Returns:
+            dict: Confusion counts plus precision and recall of the "is a candidate"
+            decision, where recall is the share of real vacancies that reach GPT.
+        """
+        tp = fp = fn = tn = 0
+        for text, is_vacancy in labelled:
+            predicted = self.is_candidate(text)
+            if predicted and is_vacancy:
+                tp += 1
+            elif predicted:
+                fp += 1
+            elif is_vacancy:
+                fn += 1
+            else:
+                tn += 1
+        return {
+            "true_positives": tp,
+            "false_positives": fp,
+            "false_negatives": fn,
+            "true_negatives": tn,
+            "precision": tp / (tp + fp) if tp + fp else 0.0,
+            "recall": tp / (tp + fn) if tp + fn else 0.0,
+        }
+
+
+# Thresholds reported by the sweep: a post without features scores 0.12, and one with
+# only the weakest positive feature 0.23.
+SWEEP_THRESHOLDS = (0.1, 0.15, 0.2, 0.3, 0.4, 0.5)
+
+
+def evaluate_against_database(threshold: float = VACANCY_PREFILTER_THRESHOLD) -> Dict[str, float]:
+    """
+    Reports precision/recall of the pre-classifier against the GPT labels stored in the DB.
+    """
+    from db.repository import TextEntryRepository
+
+    return _log_report(threshold, TextEntryRepository().get_labelled_posts())
+
+
+def sweep_against_database(thresholds: Iterable[float] = SWEEP_THRESHOLDS) -> None:
+    """
+    Reports precision/recall at several thresholds, to pick VACANCY_PREFILTER_THRESHOLD
+    from the stored GPT labels: the highest threshold whose recall is still acceptable.
+    """
+    from db.repository import TextEntryRepository
+
+    labelled = TextEntryRepository().get_labelled_posts()
+    for threshold in thresholds:
+        _log_report(threshold, labelled)
+
+
+def _log_report(threshold: float, labelled: List[Tuple[str, bool]]) -> Dict[str, float]:
+    report = VacancyPreClassifier(threshold).evaluate(labelled)
+    logger.info(
+        "Pre-classifier at threshold %.2f: precision %.3f, recall %.3f "
+        "(tp=%d, fp=%d, fn=%d, tn=%d)",
+        threshold,
+        report["precision"],
+        report["recall"],
+        report["true_positives"],
+        report["false_positives"],
+        report["false_negatives"],
+        report["true_negatives"],
+    )
+    return report
+
+
+if __name__ == "__main__":
+    sweep_against_database()
@@ -0,0 +1,194 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+
+VISA_SPONSORSHIP_VALUES = {
+    "available",
+    "unavailable",
+    "not available",
+    "not mentioned",
+    "n/a",
+    "n\\a",
+    "n-a",
+    "none",
+}
+EMPTY_VALUES = {"", "na", "n/a", "none", "null"}
+
+_ANALYSIS_PROPERTIES = {
+    "vacancy": {"type": "boolean"},
+    "cv_match": {"type": ["integer", "null"]},
+    "vacancy_title": {"type": ["string", "null"]},
+    "credentials": {"type": "array", "items": {"type": "string"}},
+    "visa_sponsorship": {
+        "type": "string",
+        "enum": ["available", "not available", "not mentioned"],
+    },
+}
+_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": _ANALYSIS_PROPERTIES,
+    "required": list(_ANALYSIS_PROPERTIES),
+    "additionalProperties": False,
+}
+_BATCH_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {"id": {"type": "integer"}, **_ANALYSIS_PROPERTIES},
+    "required": ["id", *_ANALYSIS_PROPERTIES],
+    "additionalProperties": False,
+}
+
+# response_format values for the chat completions API.
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "vacancy_analysis", "strict": True, "schema": _ANALYSIS_SCHEMA},
+}
+BATCH_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "vacancy_analysis_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"results": {"type": "array", "items": _BATCH_ITEM_SCHEMA}},
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class VacancyAnalysis(BaseModel):
+    """
+    Structured result of the recruitment analysis prompt.
+    Validators accept the usual near-misses (strings for booleans, "70%" for 70, ...).
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    vacancy: bool
+    cv_match: Optional[int] = None
+    vacancy_title: Optional[str] = None
+    credentials: Optional[str] = None
+    visa_sponsorship: Optional[str] = None
+
+    @field_validator("vacancy", mode="before")
+    @classmethod
+    def _parse_vacancy(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.strip(" []'\"").lower()
+        return value
+
+    @field_validator("cv_match", mode="before")
+    @classmethod
+    def _parse_cv_match(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            value = value.strip(" []%")
+            if value.lower() in EMPTY_VALUES:
+                return None
+            return round(float(value))
+        if isinstance(value, float):
+            return round(value)
+        return value
+
+    @field_validator("vacancy_title", mode="before")
+    @classmethod
+    def _parse_title(cls, value: Any) -> Any:
+        if isinstance(value, str) and value.strip().lower() in EMPTY_VALUES:
+            return None
+        return value
+
+    @field_validator("credentials", mode="before")
+    @classmethod
+    def _parse_credentials(cls, value: Any) -> Any:
+        if isinstance(value, dict):
+            value = [f"{key}: {item}" for key, item in value.items()]
+        if isinstance(value, list):
+            value = ", ".join(str(item).strip() for item in value if str(item).strip())
+        if isinstance(value, str) and value.strip().lower() in EMPTY_VALUES:
+            return None
+        return value
+
+    @field_validator("visa_sponsorship", mode="before")
+    @classmethod
+    def _parse_visa_sponsorship(cls, value: Any) -> Any:
+        if value is None:
+            return None
+        value = str(value).strip().lower()
+        if value not in VISA_SPONSORSHIP_VALUES:
+            raise ValueError(f"Invalid value '{value}' for field visa_sponsorship")
+        return value
+
+    @model_validator(mode="after")
+    def _require_cv_match(self) -> "VacancyAnalysis":
+        if self.vacancy and self.cv_match is None:
+            raise ValueError("CV match required when vacancy=true")
+        return self
+
+    def to_fields(self) -> Dict[str, Any]:
+        """
+        Returns the result in the shape produced by the legacy key:[value] parser,
+        which is what the repository and the rest of the pipeline expect.
+        """
+        fields: Dict[str, Any] = {"vacancy": "true" if self.vacancy else "false"}
+        if self.cv_match is not None:
+            fields["cv_match"] = self.cv_match
+        if self.vacancy_title is not None:
+            fields["vacancy_title"] = self.vacancy_title
+        fields["credentials"] = self.credentials or "na"
+        if self.visa_sponsorship is not None:
+            fields["visa_sponsorship"] = self.visa_sponsorship
+        return fields
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Parses near-valid JSON model output.
+
+    Strips <think> blocks and code fences, cuts the outermost object, and fixes trailing
+    commas, Python literals and single-quoted strings before parsing.
+
+    Returns:
+        The decoded value, or None if the text holds no recoverable JSON object.
+    """
+    text = re.sub(r"<think>.*?</think>", "", text or "", flags=re.S)
+    text = re.sub(r"```(?:json)?", "", text, flags=re.I)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    candidate = text[start:end + 1]
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+
+    candidate = re.sub(r",\s*([}\]])", r"\1", candidate)
+    candidate = re.sub(r"\bTrue\b", "true", candidate)
+    candidate = re.sub(r"\bFalse\b", "false", candidate)
+    candidate = re.sub(r"\bNone\b", "null", candidate)
+    if '"' not in candidate:
+        candidate = candidate.replace("'", '"')
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        return None
+
+
+def split_batch_results(data: Any) -> Dict[int, Dict[str, Any]]:
+    """
+    Maps post ids to result objects in a decoded batch response.
+    Accepts {"results": [...]} as well as a bare list of results.
+    """
+    items: List[Any] = data.get("results", []) if isinstance(data, dict) else data
+    results = {}
+    if not isinstance(items, list):
+        return results
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            results.setdefault(int(item.get("id")), item)
+        except (TypeError, ValueError):
+            continue
+    return results
@@ -3,4 +3,8 @@
 __all__ = [
     "config",
     "file_handler",
+    "fingerprint",
+    "page_wait",
+    "rate_limit",
+    "retry",
 ]
@@ -10,6 +10,9 @@ SMTP_EMAIL = os.getenv("SMTP_EMAIL")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 SMTP_SERVER = os.getenv("SMTP_SERVER")
 SMTP_PORT = os.getenv("SMTP_PORT")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_KEEPALIVE = float(os.getenv("SMTP_KEEPALIVE", "60"))
+SMTP_DOMAIN_RATE = float(os.getenv("SMTP_DOMAIN_RATE", "6"))
 EMAIL_SIGNATURE = os.getenv("EMAIL_SIGNATURE")
 GPT4FREE_HOST = os.getenv("GPT4FREE_HOST")
 G4FREE_PROVIDER = os.getenv("G4FREE_PROVIDER")
@@ -21,12 +24,102 @@ OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL")
 SELENIUM_HOST = os.getenv("SELENIUM_HOST")
 SELENIUM_PORT = os.getenv("SELENIUM_PORT")
 SELENIUM_COMMAND_EXECUTOR = f"http://{SELENIUM_HOST}:{SELENIUM_PORT}/wd/hub"
+# Selenium servers or Grid hubs the scraper sessions are spread over, comma-separated
+SELENIUM_COMMAND_EXECUTORS = [
+    executor.strip()
+    for executor in os.getenv("SELENIUM_COMMAND_EXECUTORS", "").split(",")
+    if executor.strip()
+] or [SELENIUM_COMMAND_EXECUTOR]
+
+# Incremental LinkedIn crawl: stop scrolling at the first post processed in an earlier
+# run, scrolling at most LINKEDIN_MAX_SCROLLS times. Without a watermark to stop at
+# (first run, incremental mode off, posts without URNs) LINKEDIN_SCROLLS applies
+LINKEDIN_INCREMENTAL = os.getenv("LINKEDIN_INCREMENTAL", "true").lower() == "true"
+LINKEDIN_MAX_SCROLLS = int(os.getenv("LINKEDIN_MAX_SCROLLS", "20"))
+LINKEDIN_SCROLLS = int(os.getenv("LINKEDIN_SCROLLS", "5"))
+
+# Several searches, separated by whitespace, are scraped concurrently by up to
+# LINKEDIN_SCRAPE_PARALLELISM browser sessions
+LINKEDIN_SEARCH_URLS = os.getenv("LINKEDIN_SEARCH_URLS", "").split() or [
+    LINKEDIN_SEARCH_URL
+]
+LINKEDIN_SCRAPE_PARALLELISM = int(os.getenv("LINKEDIN_SCRAPE_PARALLELISM", "1"))
+
+# LinkedIn session: log in again once the stored session cookie expires within the
+# margin, and give up on a verification checkpoint after the timeout (seconds)
+LINKEDIN_SESSION_MARGIN = int(os.getenv("LINKEDIN_SESSION_MARGIN", "86400"))
+LINKEDIN_CHECKPOINT_TIMEOUT = int(os.getenv("LINKEDIN_CHECKPOINT_TIMEOUT", "360"))
+
+# Daemon mode: seconds between scrapes, and when to replace the warm browser session
+LINKEDIN_DAEMON_INTERVAL = int(os.getenv("LINKEDIN_DAEMON_INTERVAL", "1800"))
+LINKEDIN_SESSION_MAX_USES = int(os.getenv("LINKEDIN_SESSION_MAX_USES", "20"))
+LINKEDIN_SESSION_MAX_HEAP_MB = float(os.getenv("LINKEDIN_SESSION_MAX_HEAP_MB", "1024"))
+
+# GPT client configuration
+GPT_MAX_CONCURRENCY = int(os.getenv("GPT_MAX_CONCURRENCY", "4"))
+GPT_REQUEST_TIMEOUT = float(os.getenv("GPT_REQUEST_TIMEOUT", "120"))
+GPT_TRANSPORT_RETRIES = int(os.getenv("GPT_TRANSPORT_RETRIES", "5"))
+GPT_FORMAT_RETRIES = int(os.getenv("GPT_FORMAT_RETRIES", "5"))
+GPT_ANALYSIS_BATCH_SIZE = int(os.getenv("GPT_ANALYSIS_BATCH_SIZE", "5"))
+GPT_STRUCTURED_OUTPUT = os.getenv("GPT_STRUCTURED_OUTPUT", "true").lower() == "true"
+GPT_BACKOFF_BASE = float(os.getenv("GPT_BACKOFF_BASE", "1"))
+GPT_BACKOFF_MAX = float(os.getenv("GPT_BACKOFF_MAX", "60"))
+
+# Cover letter generation: candidates generated and reviewed concurrently per vacancy,
+# and the overall time budget per vacancy in seconds
+COVER_LETTER_CANDIDATES = int(os.getenv("COVER_LETTER_CANDIDATES", "1"))
+COVER_LETTER_DEADLINE = float(os.getenv("COVER_LETTER_DEADLINE", "600"))
+# Word limit the local validator enforces (matches COVER_LETTER_PROMPT), and whether
+# borderline letters are passed to the GPT reviewer
+COVER_LETTER_MAX_WORDS = int(os.getenv("COVER_LETTER_MAX_WORDS", "150"))
+COVER_LETTER_GPT_REVIEW = os.getenv("COVER_LETTER_GPT_REVIEW", "true").lower() == "true"
+
+# Local vacancy pre-classifier configuration. The default threshold lies between the
+# score of a post without any feature (0.12) and that of a post with only the weakest
+# vacancy feature (0.23): tuned for full recall, it rejects posts with no vacancy
+# signal and keeps every post with one
+VACANCY_PREFILTER_ENABLED = os.getenv("VACANCY_PREFILTER_ENABLED", "true").lower() == "true"
+VACANCY_PREFILTER_THRESHOLD = float(os.getenv("VACANCY_PREFILTER_THRESHOLD", "0.2"))
+
+# Local CV match pre-ranking configuration (scores are TF-IDF cosine similarity, 0-100)
+CV_MATCH_PREFILTER_ENABLED = os.getenv("CV_MATCH_PREFILTER_ENABLED", "true").lower() == "true"
+CV_MATCH_PREFILTER_THRESHOLD = float(os.getenv("CV_MATCH_PREFILTER_THRESHOLD", "5"))
+
+# GPT response cache configuration
+GPT_CACHE_ENABLED = os.getenv("GPT_CACHE_ENABLED", "true").lower() == "true"
+GPT_CACHE_TTL_HOURS = float(os.getenv("GPT_CACHE_TTL_HOURS", "168"))
+GPT_CACHE_MAX_ENTRIES = int(os.getenv("GPT_CACHE_MAX_ENTRIES", "5000"))
+
+# Telegram delivery: messages per second allowed globally and per chat (Telegram allows
+# about 30/s overall and 1/s per chat, 20/min in groups), and retries for network errors
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+
+# Telegram digest mode: albums of up to 10 screenshots plus one summary message instead
+# of a photo and a GPT description per vacancy, grouped by CV match band ("score") or by
+# creation date window ("date")
+TELEGRAM_DIGEST_ENABLED = os.getenv("TELEGRAM_DIGEST_ENABLED", "false").lower() == "true"
+TELEGRAM_DIGEST_GROUP_BY = os.getenv("TELEGRAM_DIGEST_GROUP_BY", "score").lower()
+TELEGRAM_DIGEST_SCORE_BANDS = [
+    int(band)
+    for band in os.getenv("TELEGRAM_DIGEST_SCORE_BANDS", "80,60,40").split(",")
+]
+TELEGRAM_DIGEST_WINDOW_DAYS = int(os.getenv("TELEGRAM_DIGEST_WINDOW_DAYS", "1"))
+
+# Screenshot encoding: output format (jpeg, webp or png to keep the original), quality,
+# maximum width in pixels (0 keeps the original size) and encoder worker threads
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "jpeg").lower()
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "80"))
+SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", "1000"))
+SCREENSHOT_ENCODE_WORKERS = int(os.getenv("SCREENSHOT_ENCODE_WORKERS", "2"))
 
 # =============================================================================
 # File Paths and Resource Settings
 # =============================================================================
 BASE_DIR = os.getcwd()
 RESOURCES_PATH = "resources"
+SCREENSHOTS_PATH = "screenshots"
 
 CV_FILE_NAME_PDF = os.getenv("CV_FILE_NAME_PDF")
 CV_FILE_NAME_TXT = os.getenv("CV_FILE_NAME_TXT")
@@ -112,6 +205,31 @@ vacancy_title:[Automation Engineer]
 credentials:[email: jobs@company.com, phone: +123456789, text: "apply through website"]
 visa_sponsorship:[not mentioned]'"""
 
+RECRUITMENT_BATCH_PROMPT = f"""{RECRUITMENT_PROMPT}
+
+BATCH MODE:
+The input contains several posts. Each post starts with a line '=== POST <id> ===' and ends with a line '=== END POST <id> ==='.
+- Analyze every post independently, applying all the rules above to each one
+- For every post output a line '=== RESULT <id> ===', then the fields in the Response FORMAT, then a line '=== END RESULT <id> ==='
+- Use the same <id> as the post, keep the input order and never skip a post
+- Output nothing outside the RESULT blocks"""
+
+RECRUITMENT_JSON_PROMPT = f"""{RECRUITMENT_PROMPT}
+
+JSON OUTPUT MODE (overrides the Response FORMAT and examples above):
+Reply with a single JSON object and nothing else, no markdown and no code fences:
+{{"vacancy": true/false, "cv_match": integer percentage or null, "vacancy_title": "exact title" or null, "credentials": ["type: value", ...], "visa_sponsorship": "available" | "not available" | "not mentioned"}}
+Example: {{"vacancy": true, "cv_match": 70, "vacancy_title": "Senior Controls Engineer", "credentials": ["email: hr@company.com", "link: careers.company.com/apply"], "visa_sponsorship": "available"}}"""
+
+RECRUITMENT_BATCH_JSON_PROMPT = f"""{RECRUITMENT_JSON_PROMPT}
+
+BATCH MODE:
+The input contains several posts. Each post starts with a line '=== POST <id> ===' and ends with a line '=== END POST <id> ==='.
+- Analyze every post independently, applying all the rules above to each one
+- Reply with a single JSON object {{"results": [...]}} holding one object per post, in input order
+- Each result object has the fields above plus "id": the integer <id> of its post
+- Never skip a post"""
+
 TELEGRAM_CLEAR_PROMPT = """You are a text refinement assistant. Your task is to clean and optimize job vacancy posts to fit within a Telegram message. Follow these rules:
 
 1. Keep all essential details: job title, company name, responsibilities, requirements, and benefits.
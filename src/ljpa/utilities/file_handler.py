@@ -1,7 +1,94 @@
+import hashlib
+import logging
 import os
+import tempfile
+import time
+from typing import Iterable, Optional, Tuple
 
+from utilities.config import SCREENSHOTS_PATH
 
-def save_screenshot(path: str, data: bytes):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "wb") as f:
-        f.write(data)
+logger = logging.getLogger(__name__)
+
+_TEMP_PREFIX = ".tmp-"
+
+
+def image_extension(data: bytes) -> str:
+    """Returns the file extension matching the image format of the given bytes."""
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return "png"
+
+
+def screenshot_path_for(data: bytes, extension: Optional[str] = None) -> str:
+    """
+    Returns the content-addressed path of a screenshot: the SHA-256 of its bytes,
+    sharded into a subdirectory named after the first two hex digits. The extension
+    is detected from the bytes unless given.
+    """
+    extension = extension or image_extension(data)
+    digest = hashlib.sha256(data).hexdigest()
+    return os.path.join(SCREENSHOTS_PATH, digest[:2], f"{digest}.{extension}")
+
+
+def save_screenshot(data: bytes, extension: Optional[str] = None) -> str:
+    """
+    Stores a screenshot under its content-addressed path and returns that path.
+    Identical screenshots share one file. The file is written to a temporary name in
+    the same directory and renamed into place, so readers never see a partial image.
+    """
+    path = screenshot_path_for(data, extension)
+    try:
+        # Touch an existing copy, so remove_orphan_screenshots treats it as fresh
+        # until the row referencing it again is stored.
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=_TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
+
+
+def remove_orphan_screenshots(
+    referenced_paths: Iterable[str], min_age: float = 3600, dry_run: bool = False
+) -> Tuple[int, int]:
+    """
+    Deletes files under the screenshots directory that no referenced path points to.
+    Files younger than min_age seconds are kept, since a running scrape may not have
+    stored their row yet.
+
+    Returns:
+        Tuple[int, int]: Number of files and bytes removed, or that a dry run would remove.
+    """
+    referenced = {os.path.abspath(path) for path in referenced_paths if path}
+    cutoff = time.time() - min_age
+    removed = freed = 0
+    for root, _, files in os.walk(SCREENSHOTS_PATH):
+        for name in files:
+            path = os.path.abspath(os.path.join(root, name))
+            if path in referenced:
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.remove(path)
+            removed += 1
+            freed += stat.st_size
+    logger.info(
+        "%s %d orphaned screenshot(s), %.1f MiB.",
+        "Would remove" if dry_run else "Removed",
+        removed,
+        freed / 2**20,
+    )
+    return removed, freed
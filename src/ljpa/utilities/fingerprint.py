@@ -0,0 +1,33 @@
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """
+    Normalizes post text so that cosmetic differences (unicode forms, letter case,
+    whitespace and line breaks) do not produce different fingerprints.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def content_fingerprint(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of the normalized post text.
+    Used as the indexed dedup key for TextEntry rows.
+    """
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's bytes, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,159 @@
+import logging
+from collections import Counter
+from time import perf_counter
+from typing import Callable
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# Resolves once neither the DOM has mutated nor a new network resource has been
+# recorded for `quiet` ms, or after `timeout` ms. Returns true if the page settled.
+_QUIESCENCE_SCRIPT = """
+    const [quiet, timeout, done] = arguments;
+    const started = performance.now();
+    const resources = () => performance.getEntriesByType("resource").length;
+    let lastChange = started;
+    let lastResources = resources();
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true,
+    });
+    const check = () => {
+        const now = performance.now();
+        const count = resources();
+        if (count !== lastResources) {
+            lastResources = count;
+            lastChange = now;
+        }
+        if (now - lastChange >= quiet || now - started >= timeout) {
+            observer.disconnect();
+            done(now - lastChange >= quiet);
+            return;
+        }
+        setTimeout(check, 50);
+    };
+    setTimeout(check, 50);
+"""
+
+_COUNT_SCRIPT = """
+    return [
+        document.querySelectorAll(arguments[0]).length,
+        document.body.scrollHeight,
+    ];
+"""
+
+
+class AdaptiveWaiter:
+    """
+    Waits that return as soon as the page is ready instead of sleeping a fixed time.
+
+    Every wait is given the fixed sleep it replaces as `baseline`, so the waiter can
+    report how many seconds adaptive waiting saved over a run.
+    """
+
+    def __init__(self, driver: WebDriver, poll: float = 0.1):
+        self.driver = driver
+        self.poll = poll
+        # Counters for waits performed, timeouts, seconds waited and seconds saved.
+        self.stats: Counter = Counter()
+
+    def for_quiescence(
+        self, baseline: float, quiet: float = 0.5, timeout: float = 10.0
+    ) -> bool:
+        """
+        Waits until the DOM and network have been idle for `quiet` seconds.
+
+        Returns:
+            bool: True if the page settled before the timeout.
+        """
+        started = perf_counter()
+        try:
+            settled = bool(
+                self.driver.execute_async_script(
+                    _QUIESCENCE_SCRIPT, quiet * 1000, timeout * 1000
+                )
+            )
+        except TimeoutException:
+            settled = False
+        self._record("quiescence", started, baseline, settled)
+        return settled
+
+    def item_count(self, css_selector: str):
+        """Returns the number of matching elements and the page height, in one call."""
+        count, height = self.driver.execute_script(_COUNT_SCRIPT, css_selector)
+        return count, height
+
+    def for_growth(
+        self,
+        css_selector: str,
+        previous_count: int,
+        previous_height: int,
+        baseline: float,
+        timeout: float = 5.0,
+    ) -> bool:
+        """
+        Waits until more elements match the selector or the page grew taller, e.g.
+        after scrolling an infinite feed or clicking "show more".
+
+        Returns:
+            bool: True if new content appeared before the timeout.
+        """
+
+        def grew(_):
+            count, height = self.item_count(css_selector)
+            return count > previous_count or height > previous_height
+
+        return self.until(grew, baseline, timeout, label="growth")
+
+    def until(
+        self,
+        condition: Callable,
+        baseline: float,
+        timeout: float = 5.0,
+        label: str = "condition",
+    ) -> bool:
+        """
+        Waits for any WebDriverWait condition, polling every `poll` seconds.
+
+        Returns:
+            bool: True if the condition was met before the timeout.
+        """
+        started = perf_counter()
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(
+                condition
+            )
+            met = True
+        except TimeoutException:
+            met = False
+        self._record(label, started, baseline, met)
+        return met
+
+    def report(self, label: str) -> None:
+        """Logs the waiting done so far against the fixed sleeps it replaced."""
+        logger.info(
+            "%s: %d adaptive waits (%d timed out) took %.1fs, %.1fs less than "
+            "fixed sleeps.",
+            label,
+            self.stats["waits"],
+            self.stats["timeouts"],
+            self.stats["waited"],
+            self.stats["saved"],
+        )
+
+    def _record(self, label: str, started: float, baseline: float, met: bool):
+        elapsed = perf_counter() - started
+        self.stats["waits"] += 1
+        self.stats["timeouts"] += 0 if met else 1
+        self.stats["waited"] += elapsed
+        self.stats["saved"] += baseline - elapsed
+        logger.debug(
+            "Waited %.2fs for %s (%s, fixed sleep was %.1fs).",
+            elapsed,
+            label,
+            "met" if met else "timed out",
+            baseline,
+        )
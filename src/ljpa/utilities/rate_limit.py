@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: allows bursts of up to `capacity` operations and refills at
+    `rate` tokens per second.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Bucket size. Defaults to max(1, rate).
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def drain(self) -> None:
+        """Empties the bucket, e.g. after the server asked us to back off."""
+        self._tokens = 0.0
+        self._updated = time.monotonic()
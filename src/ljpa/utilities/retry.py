@@ -0,0 +1,42 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Returns an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): Zero-based number of the attempt that just failed.
+        base (float): Delay ceiling for the first retry, in seconds.
+        cap (float): Upper bound for the delay ceiling, in seconds.
+
+    Returns:
+        float: A random delay between 0 and min(cap, base * 2 ** attempt).
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given either in seconds or as an HTTP date.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if the header is
+        missing or unparsable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The application imports its packages relative to src/ljpa (PYTHONPATH=src/ljpa).
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "ljpa"))
+
+# utilities.config builds paths from these at import time.
+os.environ.setdefault("CV_FILE_NAME_PDF", "Example_CV.pdf")
+os.environ.setdefault("CV_FILE_NAME_TXT", "Example_CV.txt")
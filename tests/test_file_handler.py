@@ -0,0 +1,14 @@
+import os
+
+from utilities import file_handler
+
+
+def test_save_screenshot_refreshes_existing_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_handler, "SCREENSHOTS_PATH", str(tmp_path))
+    data = b"\x89PNG\r\n\x1a\n" + b"pixels"
+    path = file_handler.save_screenshot(data)
+    os.utime(path, (0, 0))
+
+    assert file_handler.save_screenshot(data) == path
+    assert os.path.getmtime(path) > 0
+    assert file_handler.remove_orphan_screenshots([]) == (0, 0)
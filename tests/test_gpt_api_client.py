@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.gpt_api_client import AsyncGPTApiClient, GPTApiClient, GPTRequestError
+from services.gpt_cache import GPTResponseCache
+
+OK = {"choices": [{"message": {"content": "hello"}}]}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+        self.text = "" if body is None else str(body)
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def post(self, url, json, timeout):
+        status = self.statuses.pop(0)
+        return FakeResponse(status, OK if status == 200 else None)
+
+
+def sync_get(statuses, retries):
+    client = GPTApiClient(cache=GPTResponseCache(enabled=False), transport_retries=retries)
+    client._retry_delay = lambda attempt, retry_after=None: 0
+    client.session = FakeSession(statuses)
+    return client.get_text("prompt", use_cache=False)
+
+
+def async_get(statuses, retries):
+    statuses = list(statuses)
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json=OK if status == 200 else {})
+
+    async def run():
+        client = AsyncGPTApiClient(
+            cache=GPTResponseCache(enabled=False), transport_retries=retries
+        )
+        client._retry_delay = lambda attempt, retry_after=None: 0
+        async with client:
+            await client._client.aclose()
+            client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await client.get_text("prompt", use_cache=False)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("get", [sync_get, async_get])
+def test_retryable_status_is_retried(get):
+    assert get([503, 429, 200], retries=2) == "hello"
+
+
+@pytest.mark.parametrize("get", [sync_get, async_get])
+def test_client_error_is_not_retried(get):
+    with pytest.raises(GPTRequestError, match="HTTP 400"):
+        get([400, 200], retries=2)
+
+
+@pytest.mark.parametrize("get", [sync_get, async_get])
+def test_retry_budget_is_shared(get):
+    with pytest.raises(GPTRequestError, match="after 2 attempts"):
+        get([503, 503, 200], retries=1)
@@ -0,0 +1,68 @@
+import asyncio
+
+from services.gpt_api_client import GPTRequestError
+from services.gpt_processor import GPTProcessor
+
+
+class NoResponseFormatGPT:
+    """Answers plain prompts and rejects every request carrying response_format."""
+
+    def __init__(self, response):
+        self.response = response
+        self.formats = []
+
+    async def get_text(self, prompt, response_format=None):
+        self.formats.append(response_format)
+        if response_format is not None:
+            raise GPTRequestError("HTTP 400: response_format is not supported", 400)
+        return self.response
+
+    def discard_cached(self, prompt, response_format=None):
+        pass
+
+
+def make_processor(monkeypatch):
+    monkeypatch.setattr(GPTProcessor, "STRUCTURED", True)
+    monkeypatch.setattr(GPTProcessor, "_plain_models", set())
+    return GPTProcessor()
+
+
+def test_single_analysis_falls_back_to_plain_prompt(monkeypatch):
+    processor = make_processor(monkeypatch)
+    gpt = NoResponseFormatGPT("vacancy: [false]")
+
+    result = asyncio.run(processor._analyze_vacancy_async(gpt, "Looking for a job"))
+
+    assert result == {"vacancy": "false"}
+    assert gpt.formats[0] is not None and gpt.formats[1:] == [None]
+    assert not processor.structured
+    assert not GPTProcessor().structured
+
+
+def test_batch_analysis_falls_back_to_plain_prompt(monkeypatch):
+    processor = make_processor(monkeypatch)
+    gpt = NoResponseFormatGPT(
+        "=== RESULT 1 ===\nvacancy: [false]\n=== RESULT 2 ===\nvacancy: [false]"
+    )
+
+    results = asyncio.run(processor._analyze_group_async(gpt, ["first", "second"]))
+
+    assert results == [{"vacancy": "false"}, {"vacancy": "false"}]
+    assert gpt.formats[0] is not None and gpt.formats[1:] == [None]
+    assert processor.stats["format_rejected"] == 1
+
+
+def test_other_bad_requests_still_fail(monkeypatch):
+    processor = make_processor(monkeypatch)
+
+    class ServerErrorGPT(NoResponseFormatGPT):
+        async def get_text(self, prompt, response_format=None):
+            self.formats.append(response_format)
+            raise GPTRequestError("HTTP 500: internal error", 500)
+
+    gpt = ServerErrorGPT("")
+    result = asyncio.run(processor._analyze_vacancy_async(gpt, "text"))
+
+    assert result == processor._failed_result()
+    assert len(gpt.formats) == 1
+    assert processor.structured
@@ -0,0 +1,40 @@
+from concurrent.futures import Future
+
+from selenium.common.exceptions import WebDriverException
+
+from services.linkedin_scraper import LinkedInScraper, ScrapedPost
+
+
+class Element:
+    def __init__(self, png=None, error=None):
+        self.png = png
+        self.error = error
+
+    @property
+    def screenshot_as_png(self):
+        if self.error:
+            raise self.error
+        return self.png
+
+
+class Encoder:
+    def submit(self, png):
+        future = Future()
+        future.set_result(png)
+        return future
+
+    def report(self):
+        pass
+
+
+def test_webdriver_error_costs_only_that_screenshot():
+    scraper = LinkedInScraper.__new__(LinkedInScraper)  # no browser session
+    scraper.encoder = Encoder()
+    scraper._switch_to_tab = lambda search_url: None
+    posts = [
+        ScrapedPost("a", "urn:1", Element(png=b"one"), "search"),
+        ScrapedPost("b", "urn:2", Element(error=WebDriverException("zero size")), "search"),
+        ScrapedPost("c", "urn:3", Element(png=b"three"), "search"),
+    ]
+
+    assert scraper.capture_screenshots(posts) == [b"one", None, b"three"]
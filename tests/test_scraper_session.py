@@ -0,0 +1,43 @@
+from services import scraper_session
+from services.scraper_session import ScraperSession
+
+
+class FakeScraper:
+    def __init__(self):
+        self.failed = False
+        self.closed = False
+
+    def healthy(self):
+        return True
+
+    def heap_size_mb(self):
+        return 10.0
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_run_recycles_session(monkeypatch):
+    monkeypatch.setattr(scraper_session, "create_scraper", FakeScraper)
+    session = ScraperSession(max_uses=5, max_heap_mb=100)
+
+    with session.acquire() as scraper:
+        scraper.failed = True  # e.g. login returned False on a checkpoint
+    assert scraper.closed
+
+    with session.acquire() as replacement:
+        pass
+    assert replacement is not scraper
+    assert session.stats["recycled_failed"] == 1
+
+
+def test_successful_run_keeps_session_warm(monkeypatch):
+    monkeypatch.setattr(scraper_session, "create_scraper", FakeScraper)
+    session = ScraperSession(max_uses=5, max_heap_mb=100)
+
+    with session.acquire() as first:
+        pass
+    with session.acquire() as second:
+        pass
+    assert second is first
+    assert session.stats["reused"] == 1
@@ -0,0 +1,13 @@
+from email import message_from_bytes, policy
+
+from services.smtp_client import build_message
+
+
+def test_non_ascii_body_is_sent_7bit_safe():
+    body = "I’d love to join — thanks!"
+    raw = build_message("me@example.com", "hr@example.com", "Application", body)
+
+    assert all(byte < 128 for byte in raw)
+    message = message_from_bytes(raw, policy=policy.default)
+    assert message["Content-Transfer-Encoding"] == "quoted-printable"
+    assert message.get_content().rstrip("\r\n") == body
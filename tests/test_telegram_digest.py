@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+from peewee import SqliteDatabase
+
+from db.database_setup import TextEntry
+from db.repository import TextEntryRepository
+from services import telegram_processor
+from services.telegram_processor import TelegramProcessor
+
+
+@pytest.fixture
+def repo():
+    database = SqliteDatabase(":memory:")
+    with database.bind_ctx([TextEntry]):
+        database.create_tables([TextEntry])
+        yield TextEntryRepository()
+    database.close()
+
+
+def store(repo, title, created_date):
+    data = {"vacancy": "true", "vacancy_title": title, "cv_match": "70%"}
+    assert repo.create_entry(data, "", f"Post about {title}")
+    TextEntry.update(created_date=created_date).where(
+        TextEntry.vacancy_title == title
+    ).execute()
+
+
+def test_group_by_date_reads_dates_stored_by_repository(repo, monkeypatch):
+    monkeypatch.setattr(telegram_processor, "TELEGRAM_DIGEST_GROUP_BY", "date")
+    monkeypatch.setattr(telegram_processor, "TELEGRAM_DIGEST_WINDOW_DAYS", 1)
+    store(repo, "Older", "2025-03-01-09-30-00")
+    store(repo, "Newer", "2025-03-02-00-18-39")
+    assert repo.create_entry(
+        {"vacancy": "true", "vacancy_title": "Today"}, "", "Post about today"
+    )
+
+    vacancies = list(repo.get_unsent_vacancies())
+    assert all(isinstance(v.created_date, str) for v in vacancies)
+
+    processor = TelegramProcessor.__new__(TelegramProcessor)  # no bot or GPT client
+    groups = processor._group_vacancies(vacancies)
+
+    labels = [label for label, _ in groups]
+    assert labels == [str(date.today()), "2025-03-02", "2025-03-01"]
+    titles = {label: [v.vacancy_title for v in members] for label, members in groups}
+    assert titles["2025-03-02"] == ["Newer"]
+    assert titles["2025-03-01"] == ["Older"]
@@ -0,0 +1,54 @@
+from concurrent.futures import Future
+
+from services.telegram_processor import TelegramProcessor
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def _done(self):
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def send_image(self, image_path, caption=""):
+        self.sent.append(("image", image_path))
+        return self._done()
+
+    def send_message(self, message):
+        self.sent.append(("message", message))
+        return self._done()
+
+
+class Vacancy:
+    vacancy_title = "PLC Engineer"
+    cv_match = "80%"
+    visa_sponsorship = "yes"
+    credentials = "jobs@example.com"
+
+    def __init__(self, screenshot_path):
+        self.screenshot_path = screenshot_path
+
+
+def make_processor():
+    processor = TelegramProcessor.__new__(TelegramProcessor)  # no bot or GPT client
+    processor.notifier = FakeNotifier()
+    return processor
+
+
+def test_vacancy_without_screenshot_is_sent_as_text():
+    processor = make_processor()
+    deliveries = processor._send_vacancy_notification(Vacancy(""), "Description")
+
+    assert processor._delivered(Vacancy(""), deliveries)
+    assert [kind for kind, _ in processor.notifier.sent] == ["message", "message"]
+
+
+def test_vacancy_with_screenshot_is_sent_as_image(tmp_path):
+    image = tmp_path / "shot.png"
+    image.write_bytes(b"\\x89PNG")
+    processor = make_processor()
+    processor._send_vacancy_notification(Vacancy(str(image)), "Description")
+
+    assert processor.notifier.sent[0] == ("image", str(image))
@@ -0,0 +1,29 @@
+import math
+
+from services.vacancy_classifier import BIAS, FEATURES, VacancyPreClassifier
+from utilities.config import VACANCY_PREFILTER_THRESHOLD
+
+LABELLED = [
+    ("We're hiring a PLC engineer. Requirements: 3+ years experience.", True),
+    ("Open position for an automation technician, full-time, visa sponsorship.", True),
+    ("Remote contract for a SCADA specialist, send your CV to jobs@example.com", True),
+    ("Great view from the office today.", False),
+    ("Thanks to everyone who came to the meetup yesterday!", False),
+    ("#OpenToWork I am looking for a new job as a PLC programmer.", False),
+    ("Excited to share that I finished the certification course.", False),
+]
+
+
+def test_default_threshold_lies_between_no_feature_and_weakest_feature():
+    classifier = VacancyPreClassifier()
+    weakest = min(weight for _, weight in FEATURES if weight > 0)
+    no_feature = 1 / (1 + math.exp(-BIAS))
+    one_feature = 1 / (1 + math.exp(-(BIAS + weakest)))
+    assert no_feature < VACANCY_PREFILTER_THRESHOLD <= one_feature
+    assert not classifier.is_candidate("Great view from the office today.")
+
+
+def test_default_threshold_keeps_every_vacancy():
+    report = VacancyPreClassifier().evaluate(LABELLED)
+    assert report["recall"] == 1.0
+    assert report["true_negatives"] == 4